@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import sys
 import os
@@ -58,6 +59,22 @@ def _build_action_objects(data: List[dict]) -> List[ActionTask]:
     return [ActionTask(**d) for d in data]
 
 
+def _get_engine() -> AlignmentEngine:
+    """This session's engine, created once and reused across its reruns.
+
+    The embedding model is loaded once per server process by the shared
+    model registry. The engine is per session and keeps its actions in an
+    in-memory store, so incremental sync (which deletes actions missing
+    from the upload) only touches this session's index and nothing is left
+    on disk when the session ends; re-indexing a new session is served from
+    the shared embedding cache rather than re-encoded.
+    """
+    if "engine" not in st.session_state:
+        with st.spinner("Loading embedding model..."):
+            st.session_state["engine"] = AlignmentEngine(vector_backend="memory")
+    return st.session_state["engine"]
+
+
 # Silence ChromaDB telemetry and deprecation noise when running via Streamlit
 os.environ.setdefault("CHROMADB_ANONYMIZED_TELEMETRY", "false")
 os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
@@ -93,6 +110,10 @@ with st.sidebar:
         uploaded_action = st.file_uploader(
             "Upload Action Plan (JSON or PDF)", type=["json", "pdf"]
         )
+        if st.button("Clear PDF conversion cache"):
+            from src.pdf_to_json import invalidate_pdf_cache
+
+            st.caption(f"Removed {invalidate_pdf_cache()} cached conversion(s).")
 
 auto_run = os.getenv("AUTO_RUN_SAMPLE", "").lower() in {"1", "true", "yes"}
 run = st.button("Run Synchronization") or auto_run
@@ -147,7 +168,7 @@ if run:
             actions = _build_action_objects(a_data)
 
         # Compute alignment
-        engine = AlignmentEngine()
+        engine = _get_engine()
         result = engine.align(strategies=strategies, actions=actions, top_k=5)
 
         # Optional RAG vs deterministic recommendations
@@ -155,17 +176,16 @@ if run:
         recs = None
         if use_llm:
             rag = RAGEngine()
-            rag_out_per_strategy = []
-            for r in result["strategy_results"]:
-                rag_json = rag.generate(
-                    strategy=StrategicObjective(
+            rag_requests = [
+                {
+                    "strategy": StrategicObjective(
                         id=r["strategy_id"],
                         title=r["strategy_title"],
                         description="",  # description not carried in result; keep empty
                         kpis=[],
                     ),
-                    current_score=float(r.get("avg_top3_similarity", 0.0)),
-                    retrieved_actions=[
+                    "current_score": float(r.get("avg_top3_similarity", 0.0)),
+                    "retrieved_actions": [
                         {
                             "title": m.get("title"),
                             "owner": m.get("owner"),
@@ -173,15 +193,19 @@ if run:
                         }
                         for m in r.get("top_matches", [])
                     ],
-                )
-                rag_out_per_strategy.append(
-                    {
-                        "strategy_id": r["strategy_id"],
-                        "strategy_title": r["strategy_title"],
-                        "alignment_label": r["alignment_label"],
-                        "rag": rag_json,
-                    }
-                )
+                }
+                for r in result["strategy_results"]
+            ]
+            rag_outputs = asyncio.run(rag.generate_many(rag_requests))
+            rag_out_per_strategy = [
+                {
+                    "strategy_id": r["strategy_id"],
+                    "strategy_title": r["strategy_title"],
+                    "alignment_label": r["alignment_label"],
+                    "rag": rag_json,
+                }
+                for r, rag_json in zip(result["strategy_results"], rag_outputs)
+            ]
         else:
             recs = generate_recommendations(result)
 
@@ -293,8 +317,9 @@ if run:
                 }
             else:
                 payload = {"result": result, "recommendations": recs or []}
-            # Save to outputs folder
-            out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            # Serialize once; reused for the saved file and the download button
+            payload_json = json.dumps(payload, indent=2)
+            out_path.write_text(payload_json, encoding="utf-8")
             st.success(f"Results saved to {out_path}")
             # If user uploaded PDFs, offer the converted JSON downloads
             if not use_sample and uploaded_strategic and uploaded_action:
@@ -315,7 +340,7 @@ if run:
             # Downloads
             st.download_button(
                 label="Download Results JSON",
-                data=json.dumps(payload, indent=2),
+                data=payload_json,
                 file_name=f"alignment_result_{timestamp}.json",
                 mime="application/json",
             )
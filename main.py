@@ -51,6 +51,12 @@ def run_cli() -> int:
     return subprocess.call(cmd, cwd=str(ROOT_DIR), env=env)
 
 
+def run_autotune(extra: list[str]) -> int:
+    cmd = [sys.executable, str(ROOT_DIR / "scripts" / "autotune_encoder.py"), *extra]
+    print("Autotuning embedding encoder...\n", " ".join(cmd))
+    return subprocess.call(cmd, cwd=str(ROOT_DIR), env=os.environ.copy())
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(
         description="Strategy–Action Synchronization AI launcher"
@@ -62,7 +68,16 @@ def main(argv: list[str] | None = None) -> int:
 
     cli = sub.add_parser("cli", help="Run the CLI alignment script once")
 
-    args = parser.parse_args(argv)
+    sub.add_parser(
+        "autotune",
+        help="Benchmark encoder settings on this CPU and save the best "
+        "(extra options go to scripts/autotune_encoder.py)",
+    )
+
+    # Unknown options are forwarded to the autotune script
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command != "autotune":
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
 
     # Maintenance/disable flag
     if os.getenv("DISABLE_ALL_SERVICES", "").lower() in {"1", "true", "yes"}:
@@ -73,6 +88,8 @@ def main(argv: list[str] | None = None) -> int:
         return run_ui(port=getattr(args, "port", None))
     elif args.command == "cli":
         return run_cli()
+    elif args.command == "autotune":
+        return run_autotune(extra)
     else:
         parser.print_help()
         return 1
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, List
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "data"
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: list[str] | None = None) -> int:
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from src.autotune import DEFAULT_BUDGETS, autotune, save_tuned_config
+    from src.inference_backends import BACKENDS, embedding_id
+    from src.models import load_actions, load_strategies
+    from src.text_utils import action_to_text, strategy_to_text
+
+    parser = argparse.ArgumentParser(
+        description="Tune encoder threads and token budget on this host's CPU"
+    )
+    parser.add_argument("--actions", type=Path, default=DATA_DIR / "action.json")
+    parser.add_argument("--strategies", type=Path, default=DATA_DIR / "strategic.json")
+    parser.add_argument("--sample-size", type=int, default=512)
+    parser.add_argument(
+        "--threads", type=_int_list, help="e.g. 1,2,4 (default: powers of two to cpu_count)"
+    )
+    parser.add_argument("--budgets", type=_int_list, default=list(DEFAULT_BUDGETS))
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument(
+        "--model",
+        default=os.environ.get("EMBEDDING_MODEL")
+        or "sentence-transformers/all-MiniLM-L6-v2",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=os.environ.get("EMBEDDING_BACKEND") or "torch",
+    )
+    parser.add_argument(
+        "--embedder",
+        choices=["model", "hash"],
+        default="model",
+        help="'hash' is a model-free dry run and is never saved",
+    )
+    parser.add_argument("--no-save", action="store_true", help="Only print the report")
+    args = parser.parse_args(argv)
+
+    texts = [action_to_text(a) for a in load_actions(args.actions)]
+    texts += [strategy_to_text(s) for s in load_strategies(args.strategies)]
+    model: Any
+    if args.embedder == "hash":
+        from src.synthetic import HashEmbedder
+
+        model = HashEmbedder()
+    else:
+        from src.model_registry import get_embedder
+
+        model = get_embedder(
+            args.model, os.environ.get("EMBEDDING_DEVICE"), args.backend
+        )
+
+    report = autotune(
+        model,
+        texts,
+        threads=args.threads,
+        budgets=args.budgets,
+        sample_size=args.sample_size,
+        repeats=args.repeats,
+        # onnxruntime fixes its thread count when the session is created
+        tune_threads=args.backend != "onnx",
+    )
+    report["model"] = embedding_id(args.model, args.backend)
+    if not args.no_save and args.embedder == "model":
+        report["saved_to"] = str(save_tuned_config(report["model"], report["best"]))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
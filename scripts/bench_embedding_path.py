@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Sequence
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class _TableEmbedder:
+    """Returns precomputed rows so only the engine's own data path is measured."""
+
+    def __init__(self, texts: Sequence[str], dim: int, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        self.matrix = rng.standard_normal((len(texts), dim), dtype=np.float32)
+        self.row = {t: i for i, t in enumerate(texts)}
+
+    def encode(self, texts: Sequence[str], **kwargs: Any) -> np.ndarray:
+        return self.matrix[[self.row[t] for t in texts]]
+
+
+def _measure(fn: Callable[[], Any], trace: bool = True) -> Dict[str, Any]:
+    """Wall time of ``fn`` untraced, then peak traced allocations of a second run."""
+    gc.collect()
+    start = time.perf_counter()
+    fn()
+    out: Dict[str, Any] = {"seconds": round(time.perf_counter() - start, 4)}
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        out["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        tracemalloc.stop()
+    return out
+
+
+def main(argv: list[str] | None = None) -> int:
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from src.action_table import ActionTable
+    from src.alignment import AlignmentEngine
+    from src.synthetic import synthetic_actions
+
+    parser = argparse.ArgumentParser(
+        description="Time and peak traced memory of the embed → store path"
+    )
+    parser.add_argument("--actions", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument(
+        "--no-peak", action="store_true", help="Skip the (slow) tracemalloc runs"
+    )
+    args = parser.parse_args(argv)
+
+    table = ActionTable.from_actions(synthetic_actions(args.actions, words=12))
+    # Distinct documents so every row is a cache miss on the cold run
+    table.documents = [f"{i} {d}" for i, d in enumerate(table.documents)]
+    embedder = _TableEmbedder(table.documents, args.dim)
+
+    report: Dict[str, Any] = {"actions": args.actions, "dim": args.dim}
+    engine = AlignmentEngine(
+        vector_backend="memory", embedder=embedder, cache_directory=None, timings=False
+    )
+    trace = not args.no_peak
+    report["embed_no_cache"] = _measure(
+        lambda: engine._embed_texts(table.documents), trace
+    )
+    report["index_no_cache"] = _measure(
+        lambda: engine.index_actions(table, sync_mode="full"), trace
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+
+        def _cold() -> None:
+            # Fresh cache directory per run so every lookup misses
+            engine = AlignmentEngine(
+                vector_backend="memory",
+                embedder=embedder,
+                cache_directory=tempfile.mkdtemp(dir=tmp),
+                timings=False,
+            )
+            engine._embed_texts(table.documents)
+            engine.embedding_cache.close()
+
+        report["embed_cold_cache"] = _measure(_cold, trace)
+        warm = AlignmentEngine(
+            vector_backend="memory", embedder=embedder, cache_directory=tmp, timings=False
+        )
+        warm._embed_texts(table.documents)
+        report["embed_warm_cache"] = _measure(
+            lambda: warm._embed_texts(table.documents), trace
+        )
+        warm.embedding_cache.close()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _fixed_batches(order: np.ndarray, size: int) -> List[np.ndarray]:
+    return [order[i : i + size] for i in range(0, len(order), size)]
+
+
+def main(argv: list[str] | None = None) -> int:
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from src.batching import (
+        encode_bucketed,
+        padded_tokens,
+        token_budget_batches,
+        token_lengths,
+    )
+    from src.synthetic import synthetic_actions
+    from src.text_utils import action_to_text
+
+    parser = argparse.ArgumentParser(
+        description="Padding and encode time: fixed-size vs token-budget batches"
+    )
+    parser.add_argument("--actions", type=int, default=20_000)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--length-spread", type=float, default=0.9)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--token-budget", type=int, default=8192)
+    parser.add_argument(
+        "--embedder",
+        choices=["approx", "model"],
+        default="approx",
+        help="'model' uses the real tokenizer and also times encoding",
+    )
+    args = parser.parse_args(argv)
+
+    texts = [
+        action_to_text(a)
+        for a in synthetic_actions(
+            args.actions, words=args.words, length_spread=args.length_spread
+        )
+    ]
+    model: Any = None
+    if args.embedder == "model":
+        from src.alignment import AlignmentEngine
+
+        model = AlignmentEngine(cache_directory=None, vector_backend="memory").embedder
+    lengths = token_lengths(model, texts)
+
+    plans = {
+        "fixed_input_order": _fixed_batches(np.arange(len(texts)), args.batch_size),
+        "fixed_length_sorted": _fixed_batches(
+            np.argsort(-lengths, kind="stable"), args.batch_size
+        ),
+        "token_budget": token_budget_batches(lengths, args.token_budget),
+    }
+    report: Dict[str, Any] = {
+        "texts": len(texts),
+        "tokens": int(lengths.sum()),
+        "mean_tokens": round(float(lengths.mean()), 1),
+        "max_tokens": int(lengths.max()),
+        "strategies": {},
+    }
+    for name, batches in plans.items():
+        padded = padded_tokens(lengths, batches)
+        report["strategies"][name] = {
+            "batches": len(batches),
+            "padded_tokens": padded,
+            "padding_ratio": round(padded / max(1, int(lengths.sum())), 3),
+        }
+
+    if model is not None:
+        # SentenceTransformer sorts by length internally within one encode call
+        start = time.perf_counter()
+        model.encode(texts, batch_size=args.batch_size, normalize_embeddings=True)
+        report["strategies"]["fixed_length_sorted"]["seconds"] = round(
+            time.perf_counter() - start, 3
+        )
+        start = time.perf_counter()
+        encode_bucketed(model, texts, args.token_budget)
+        report["strategies"]["token_budget"]["seconds"] = round(
+            time.perf_counter() - start, 3
+        )
+
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
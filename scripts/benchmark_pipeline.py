@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _parse_size(text: str) -> Tuple[int, int]:
+    """``"1000x100000"`` → (strategies, actions)."""
+    s, _, a = text.lower().partition("x")
+    return int(s), int(a)
+
+
+def _time(stages: Dict[str, Any], name: str, items: int, fn: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    stages[name] = {
+        "seconds": round(elapsed, 6),
+        "items": items,
+        "items_per_s": round(items / elapsed, 2) if elapsed > 0 else None,
+    }
+    return out
+
+
+def _engine_stages(
+    stages: Dict[str, Any], prefix: str, result: Dict[str, Any], names: Tuple[str, ...]
+) -> None:
+    """Copy engine spans (e.g. "scoring") out of an ``align`` result as stages."""
+    for name in names:
+        span = result.get("timings", {}).get(name)
+        if span:
+            stages[f"{prefix}_{name}"] = {
+                "seconds": span["wall_seconds"],
+                "items": span["items"],
+                "items_per_s": span["items_per_s"],
+            }
+
+
+def run_size(
+    n_strategies: int,
+    n_actions: int,
+    words: int,
+    embedder: str,
+    backend: str,
+    top_k: int,
+    matrix: bool,
+    seed: int,
+    encode_workers: int | None = None,
+    precision: str = "float32",
+) -> Dict[str, Any]:
+    """Time each pipeline stage for one synthetic plan size.
+
+    ``align`` is also split into its engine stages (``align_query``,
+    ``align_scoring``, ...) so a regression can be attributed.
+    """
+    from src import viz
+    from src.alignment import AlignmentEngine
+    from src.io_utils import matches_long_dataframe, strategies_dataframe
+    from src.synthetic import HashEmbedder, synthetic_actions, synthetic_strategies
+    from src.text_utils import action_to_text, strategy_to_text
+
+    stages: Dict[str, Any] = {}
+    strategies, actions = _time(
+        stages,
+        "generate",
+        n_strategies + n_actions,
+        lambda: (
+            synthetic_strategies(n_strategies, words=words, seed=seed),
+            synthetic_actions(n_actions, words=words, seed=seed + 1),
+        ),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = AlignmentEngine(
+            persist_directory=os.path.join(tmp, "chroma"),
+            cache_directory=os.path.join(tmp, "embedding_cache"),
+            vector_backend=backend,
+            embedder=HashEmbedder() if embedder == "hash" else None,
+            encode_workers=encode_workers,
+            precision=precision,
+            timings=True,
+            autotune=False,
+        )
+        a_texts = [action_to_text(a) for a in actions]
+        s_texts = [strategy_to_text(s) for s in strategies]
+        # Cold embedding (fills the embedding cache used by the later stages)
+        _time(stages, "embed_actions", n_actions, lambda: engine._embed_texts(a_texts))
+        s_embs = _time(
+            stages, "embed_strategies", n_strategies, lambda: engine._embed_texts(s_texts)
+        )
+        # Warm cache: hashing, cache reads and vector store writes
+        _time(
+            stages,
+            "index_actions",
+            n_actions,
+            lambda: engine.index_actions(actions, sync_mode="full"),
+        )
+        _time(
+            stages,
+            "retrieval",
+            n_strategies,
+            lambda: engine.store.query_by_embeddings(s_embs, top_k=top_k),
+        )
+        engine.timings.reset()
+        result = _time(
+            stages,
+            "align",
+            n_strategies,
+            lambda: engine.align(strategies, None, top_k=top_k),
+        )
+        _engine_stages(stages, "align", result, ("text_build", "query", "scoring"))
+        if matrix:
+            matrix_result = _time(
+                stages,
+                "align_matrix",
+                n_strategies,
+                lambda: engine.align(strategies, actions, top_k=top_k, mode="matrix"),
+            )
+            _engine_stages(
+                stages, "align_matrix", matrix_result, ("similarity", "scoring")
+            )
+
+    results = result["strategy_results"]
+    _time(
+        stages,
+        "strategies_dataframe",
+        n_strategies,
+        lambda: strategies_dataframe(results),
+    )
+    _time(
+        stages,
+        "matches_dataframe",
+        n_strategies,
+        lambda: matches_long_dataframe(results),
+    )
+    for name in (
+        "fig_strategy_bar",
+        "fig_alignment_pie",
+        "fig_top_match_heatmap",
+        "fig_owner_workload",
+    ):
+        fn = getattr(viz, name)
+        fn(results[:1])  # warm-up: plotly builds its validators lazily
+        _time(stages, name, n_strategies, lambda fn=fn: fn(results))
+
+    return {
+        "strategies": n_strategies,
+        "actions": n_actions,
+        "words": words,
+        # Everything besides the size that changes timings; see compare_reports
+        "config": {
+            "backend": backend,
+            "embedder": embedder,
+            "precision": precision,
+            "mode": "top_k+matrix" if matrix else "top_k",
+            "top_k": top_k,
+            "encode_workers": encode_workers,
+        },
+        "stages": stages,
+    }
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.25,
+    min_seconds: float = 0.01,
+) -> List[Dict[str, Any]]:
+    """Stages that got slower than ``baseline`` by more than ``tolerance``.
+
+    Runs are matched on (strategies, actions, words); stages faster than
+    ``min_seconds`` in the baseline are ignored as timer noise. Raises
+    ValueError when a matching baseline run used a different ``config``
+    (backend, embedder, precision, mode, ...), since those timings are not
+    comparable.
+    """
+
+    def _key(run: Dict[str, Any]) -> Tuple[int, int, int]:
+        return (run["strategies"], run["actions"], run["words"])
+
+    base_runs = {_key(r): r for r in baseline.get("runs", [])}
+    mismatched = [
+        {
+            "size": _key(run),
+            "config": run.get("config"),
+            "baseline_config": base_runs[_key(run)].get("config"),
+        }
+        for run in current.get("runs", [])
+        if _key(run) in base_runs
+        and run.get("config") != base_runs[_key(run)].get("config")
+    ]
+    if mismatched:
+        raise ValueError(f"Baseline runs use a different configuration: {mismatched}")
+    regressions: List[Dict[str, Any]] = []
+    for run in current.get("runs", []):
+        base = base_runs.get(_key(run))
+        if base is None:
+            continue
+        for stage, timing in run["stages"].items():
+            before = base["stages"].get(stage, {}).get("seconds")
+            if not before or before < min_seconds:
+                continue
+            ratio = timing["seconds"] / before
+            if ratio > 1.0 + tolerance:
+                regressions.append(
+                    {
+                        "strategies": run["strategies"],
+                        "actions": run["actions"],
+                        "words": run["words"],
+                        "stage": stage,
+                        "baseline_seconds": before,
+                        "seconds": timing["seconds"],
+                        "ratio": round(ratio, 3),
+                    }
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+
+    parser = argparse.ArgumentParser(description="Alignment pipeline benchmark suite")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=["100x1000", "1000x10000"],
+        help="Plan sizes as <strategies>x<actions>",
+    )
+    parser.add_argument("--words", type=int, default=30, help="Words per description")
+    parser.add_argument(
+        "--embedder",
+        choices=["hash", "model"],
+        default="hash",
+        help="'hash' isolates pipeline overhead; 'model' uses the real embedding model",
+    )
+    parser.add_argument(
+        "--encode-workers",
+        type=int,
+        help="Encoder processes for --embedder model (default: EMBEDDING_WORKERS or 1)",
+    )
+    parser.add_argument("--backend", choices=["memory", "chroma"], default="memory")
+    parser.add_argument(
+        "--precision", choices=["float32", "float16", "int8"], default="float32"
+    )
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--matrix", action="store_true", help="Also time matrix mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", type=Path, default=ROOT / "outputs" / "benchmark_report.json"
+    )
+    parser.add_argument("--baseline", type=Path, help="Report to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="Allowed slowdown ratio"
+    )
+    args = parser.parse_args(argv)
+
+    runs = []
+    for size in args.sizes:
+        n_strategies, n_actions = _parse_size(size)
+        run = run_size(
+            n_strategies,
+            n_actions,
+            words=args.words,
+            embedder=args.embedder,
+            backend=args.backend,
+            top_k=args.top_k,
+            matrix=args.matrix,
+            seed=args.seed,
+            encode_workers=args.encode_workers,
+            precision=args.precision,
+        )
+        print(json.dumps(run))
+        runs.append(run)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "embedder": args.embedder,
+        "backend": args.backend,
+        "encode_workers": args.encode_workers,
+        "precision": args.precision,
+        "runs": runs,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved report: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        try:
+            regressions = compare_reports(report, baseline, tolerance=args.tolerance)
+        except ValueError as exc:
+            print(f"Cannot compare with {args.baseline}: {exc}")
+            return 2
+        for r in regressions:
+            print("REGRESSION " + json.dumps(r))
+        if regressions:
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def main(argv: list[str] | None = None) -> int:
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from src.batching import encode_bucketed
+    from src.inference_backends import BACKENDS, agreement_report, export_onnx
+    from src.model_registry import get_embedder
+    from src.models import load_actions, load_strategies
+    from src.text_utils import action_to_text, strategy_to_text
+
+    parser = argparse.ArgumentParser(
+        description="Export the ONNX model once, or compare embedding backends"
+    )
+    parser.add_argument("command", choices=["export", "report"])
+    parser.add_argument(
+        "--model",
+        default=os.environ.get("EMBEDDING_MODEL")
+        or "sentence-transformers/all-MiniLM-L6-v2",
+    )
+    parser.add_argument("--reference", choices=BACKENDS, default="torch")
+    parser.add_argument(
+        "--backends", nargs="+", choices=BACKENDS, default=["onnx", "torch-int8"]
+    )
+    parser.add_argument(
+        "--strategies", type=Path, default=ROOT / "data" / "strategic.json"
+    )
+    parser.add_argument("--actions", type=Path, default=ROOT / "data" / "action.json")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--token-budget", type=int, default=8192)
+    parser.add_argument("--output", type=Path, help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(f"ONNX export ready: {export_onnx(args.model)}")
+        return 0
+
+    action_texts = [action_to_text(a) for a in load_actions(args.actions)]
+    strategy_texts = [strategy_to_text(s) for s in load_strategies(args.strategies)]
+
+    def _run(backend: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        model = get_embedder(args.model, "cpu", backend)
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        actions = encode_bucketed(model, action_texts, args.token_budget)
+        seconds = time.perf_counter() - start
+        return {
+            "actions": actions,
+            "strategies": encode_bucketed(model, strategy_texts, args.token_budget),
+            "load_seconds": round(loaded, 3),
+            "encode_seconds": round(seconds, 4),
+            "texts_per_s": round(len(action_texts) / max(seconds, 1e-9), 1),
+        }
+
+    timing_keys = ("load_seconds", "encode_seconds", "texts_per_s")
+    ref = _run(args.reference)
+    report: Dict[str, Any] = {
+        "model": args.model,
+        "reference": {"backend": args.reference, **{k: ref[k] for k in timing_keys}},
+        "backends": {},
+    }
+    for backend in args.backends:
+        if backend == args.reference:
+            continue
+        run = _run(backend)
+        speedup = ref["encode_seconds"] / max(run["encode_seconds"], 1e-9)
+        report["backends"][backend] = {
+            **{k: run[k] for k in timing_keys},
+            "speedup": round(speedup, 2),
+            **agreement_report(
+                ref["actions"],
+                run["actions"],
+                ref["strategies"],
+                run["strategies"],
+                top_k=args.top_k,
+            ),
+        }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
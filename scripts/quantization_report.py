@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def main(argv: list[str] | None = None) -> int:
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    from src.alignment import AlignmentEngine
+    from src.models import load_actions, load_strategies
+    from src.quantization import PRECISIONS, recall_report
+    from src.synthetic import HashEmbedder
+    from src.text_utils import action_to_text, strategy_to_text
+
+    parser = argparse.ArgumentParser(
+        description="Top-k recall and score drift of quantized embeddings vs float32"
+    )
+    parser.add_argument(
+        "--strategies", type=Path, default=ROOT / "data" / "strategic.json"
+    )
+    parser.add_argument("--actions", type=Path, default=ROOT / "data" / "action.json")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--precisions", nargs="+", default=["float16", "int8"], choices=PRECISIONS
+    )
+    parser.add_argument("--embedder", choices=["model", "hash"], default="model")
+    parser.add_argument(
+        "--cache-directory",
+        help="Reuse a float32 embedding cache (default: encode without caching)",
+    )
+    parser.add_argument("--output", type=Path, help="Also write the report here")
+    args = parser.parse_args(argv)
+
+    engine = AlignmentEngine(
+        vector_backend="memory",
+        cache_directory=args.cache_directory,
+        embedder=HashEmbedder() if args.embedder == "hash" else None,
+        precision="float32",
+        timings=False,
+    )
+    a_embs = engine._embed_texts(
+        [action_to_text(a) for a in load_actions(args.actions)]
+    )
+    s_embs = engine._embed_texts(
+        [strategy_to_text(s) for s in load_strategies(args.strategies)]
+    )
+    report = recall_report(a_embs, s_embs, top_k=args.top_k, precisions=args.precisions)
+    report["model"] = engine.model_name if args.embedder == "model" else "hash"
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text, encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
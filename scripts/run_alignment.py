@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import argparse
+import asyncio
 import json
 from datetime import datetime, UTC
 import os
@@ -13,7 +15,24 @@ OUTPUTS_DIR = ROOT / "outputs"
 OUTPUTS_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def main() -> int:
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run strategy–action alignment.")
+    parser.add_argument(
+        "--format",
+        choices=["json", "parquet", "both"],
+        default=os.environ.get("ALIGNMENT_OUTPUT_FORMAT") or "json",
+        help="Output format: JSON payload, Parquet tables + manifest, or both.",
+    )
+    parser.add_argument(
+        "--timings-out",
+        type=Path,
+        help="Write per-stage timings (.prom for Prometheus text, else JSON lines).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
     # Ensure project root is on sys.path for 'src' imports
     import sys
 
@@ -28,20 +47,21 @@ def main() -> int:
         print("All services are disabled by administrator (DISABLE_ALL_SERVICES).")
         return 0
 
-    from src.models import load_actions, load_strategies, StrategicObjective
+    from src.models import iter_action_batches, load_strategies, StrategicObjective
     from src.alignment import AlignmentEngine
     from src.recommendations import generate_recommendations
     from src.rag_engine import RAGEngine
 
     strategies = load_strategies(DATA_DIR / "strategic.json")
-    actions = load_actions(DATA_DIR / "action.json")
 
     engine = AlignmentEngine()
-    result = engine.align(strategies=strategies, actions=actions, top_k=5)
+    # Stream actions into the index in validated batches; memory stays flat
+    engine.index_action_batches(iter_action_batches(DATA_DIR / "action.json"))
+    result = engine.align(strategies=strategies, actions=None, top_k=5)
 
     # Try RAG if key exists; fallback to rule-based recommendations
     rag = RAGEngine()
-    rag_out_per_strategy = []
+    rag_requests = []
     for r in result["strategy_results"]:
         # We only have title in result; pull description from original object for a better prompt
         s_obj = next(
@@ -50,26 +70,31 @@ def main() -> int:
                 id=r["strategy_id"], title=r["strategy_title"], description="", kpis=[]
             ),
         )
-        rag_json = rag.generate(
-            strategy=s_obj,
-            current_score=float(r.get("avg_top3_similarity", 0.0)),
-            retrieved_actions=[
-                {
-                    "title": m.get("title"),
-                    "owner": m.get("owner"),
-                    "similarity": float(m.get("similarity", 0.0)),
-                }
-                for m in r.get("top_matches", [])
-            ],
-        )
-        rag_out_per_strategy.append(
+        rag_requests.append(
             {
-                "strategy_id": r["strategy_id"],
-                "strategy_title": r["strategy_title"],
-                "alignment_label": r["alignment_label"],
-                "rag": rag_json,
+                "strategy": s_obj,
+                "current_score": float(r.get("avg_top3_similarity", 0.0)),
+                "retrieved_actions": [
+                    {
+                        "title": m.get("title"),
+                        "owner": m.get("owner"),
+                        "similarity": float(m.get("similarity", 0.0)),
+                    }
+                    for m in r.get("top_matches", [])
+                ],
             }
         )
+    # Per-strategy LLM calls run concurrently (bounded by RAG_MAX_CONCURRENCY)
+    rag_outputs = asyncio.run(rag.generate_many(rag_requests))
+    rag_out_per_strategy = [
+        {
+            "strategy_id": r["strategy_id"],
+            "strategy_title": r["strategy_title"],
+            "alignment_label": r["alignment_label"],
+            "rag": rag_json,
+        }
+        for r, rag_json in zip(result["strategy_results"], rag_outputs)
+    ]
 
     # Rule-based for comparison
     recs = generate_recommendations(result)
@@ -81,12 +106,33 @@ def main() -> int:
     }
 
     timestamp = datetime.now(UTC).strftime("%Y%m%d-%H%M%S")
-    out_path = OUTPUTS_DIR / f"alignment_cli_{timestamp}.json"
-    out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    out_paths = []
+    if args.format in {"json", "both"}:
+        out_path = OUTPUTS_DIR / f"alignment_cli_{timestamp}.json"
+        out_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        out_paths.append(out_path)
+    if args.format in {"parquet", "both"}:
+        from src.io_utils import write_alignment_parquet
+
+        out_paths.append(
+            write_alignment_parquet(payload, OUTPUTS_DIR / f"alignment_cli_{timestamp}")
+        )
 
     print(f"Overall Score: {result['overall_score']:.2f}")
     print(f"Coverage %: {result['coverage_percent']:.2f}")
-    print(f"Saved output: {out_path}")
+    for out_path in out_paths:
+        print(f"Saved output: {out_path}")
+
+    if args.timings_out and result.get("timings"):
+        from src.instrumentation import to_json_lines, to_prometheus
+
+        if args.timings_out.suffix == ".prom":
+            text = to_prometheus(result["timings"], labels={"model": result["model"]})
+        else:
+            text = to_json_lines(result["timings"], run=timestamp, model=result["model"])
+        args.timings_out.parent.mkdir(parents=True, exist_ok=True)
+        args.timings_out.write_text(text, encoding="utf-8")
+        print(f"Saved timings: {args.timings_out}")
     return 0
 
 
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .models import ActionTask
+from .text_utils import action_to_text
+
+
+@dataclass
+class ActionTable:
+    """Columnar view of an action plan for the alignment hot path.
+
+    One list per field instead of one object (and one metadata dict) per
+    action, plus an optional contiguous float32 embedding matrix whose rows
+    follow ``ids``. Build it with ``ActionTable.from_actions``.
+    """
+
+    ids: List[str]
+    titles: List[str]
+    owners: List[str]
+    start_dates: List[str | None]
+    end_dates: List[str | None]
+    documents: List[str]
+    embeddings: np.ndarray | None = None
+    content_hashes: List[str] | None = field(default=None)
+
+    @classmethod
+    def from_actions(cls, actions: Sequence[ActionTask]) -> "ActionTable":
+        return cls(
+            ids=[a.id for a in actions],
+            titles=[a.title for a in actions],
+            owners=[a.owner for a in actions],
+            start_dates=[str(a.start_date) if a.start_date else None for a in actions],
+            end_dates=[str(a.end_date) if a.end_date else None for a in actions],
+            documents=[action_to_text(a) for a in actions],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def columns(self) -> Dict[str, List[Any]]:
+        """Metadata columns keyed by the field names used in the vector stores."""
+        cols: Dict[str, List[Any]] = {
+            "title": self.titles,
+            "owner": self.owners,
+            "start_date": self.start_dates,
+            "end_date": self.end_dates,
+        }
+        if self.content_hashes is not None:
+            cols["content_hash"] = self.content_hashes
+        return cols
+
+    def metadata(self, i: int) -> Dict[str, Any]:
+        """Metadata dict for row ``i`` (built on demand)."""
+        return {k: col[i] for k, col in self.columns().items()}
+
+    def metadatas(self) -> List[Dict[str, Any]]:
+        """Per-row metadata dicts, for backends that need records (ChromaDB)."""
+        cols = self.columns()
+        keys = list(cols)
+        return [dict(zip(keys, row)) for row in zip(*cols.values())] if self.ids else []
+
+    def take(self, indices: Sequence[int]) -> "ActionTable":
+        """Subset of rows, in the given order."""
+        idx = list(indices)
+        return ActionTable(
+            ids=[self.ids[i] for i in idx],
+            titles=[self.titles[i] for i in idx],
+            owners=[self.owners[i] for i in idx],
+            start_dates=[self.start_dates[i] for i in idx],
+            end_dates=[self.end_dates[i] for i in idx],
+            documents=[self.documents[i] for i in idx],
+            embeddings=(
+                self.embeddings[idx] if self.embeddings is not None else None
+            ),
+            content_hashes=(
+                [self.content_hashes[i] for i in idx]
+                if self.content_hashes is not None
+                else None
+            ),
+        )
@@ -1,14 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Tuple, Union
+import hashlib
+import json
 import os
 
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
+from .action_table import ActionTable
+from .autotune import load_tuned_config, torch_threads
+from .batching import encode_bucketed
+from .embedding_cache import EmbeddingCache
+from .encoder_pool import EncoderPool, get_encoder_pool
+from .inference_backends import check_backend, embedding_id
+from .instrumentation import StageTimings
+from .model_registry import get_embedder
 from .models import StrategicObjective, ActionTask
-from .text_utils import strategy_to_text, action_to_text
-from .vector_store import ActionVectorStore
+from .quantization import check_precision
+from .similarity_matrix import SparseSimilarity, compute_sparse_similarity
+from .text_utils import strategy_to_text
+from .vector_store import VectorBackend, create_vector_store
 
 
 @dataclass
@@ -17,6 +29,9 @@ class Thresholds:
     medium: float = 0.55
 
 
+ActionsLike = Union[List[ActionTask], ActionTable]
+
+
 class AlignmentEngine:
     """Compute alignment between strategies and actions using embeddings + ChromaDB."""
 
@@ -25,43 +40,243 @@ class AlignmentEngine:
         model_name: str | None = None,
         persist_directory: str = "chroma_db",
         thresholds: Thresholds | None = None,
+        cache_directory: str | None = "embedding_cache",
+        cache_max_entries: int = 100_000,
+        sync_mode: str = "incremental",
+        vector_backend: str | None = None,
+        device: str | None = None,
+        embedder: Any | None = None,
+        timings: bool | None = None,
+        precision: str | None = None,
+        encode_workers: int | None = None,
+        token_budget: int | None = None,
+        autotune: bool | None = None,
+        backend: str | None = None,
+        collection_name: str = "actions",
     ) -> None:
         self.model_name = (
             model_name
             or os.environ.get("EMBEDDING_MODEL")
             or "sentence-transformers/all-MiniLM-L6-v2"
         )
-        self.embedder = SentenceTransformer(self.model_name)
-        self.store = ActionVectorStore(persist_directory=persist_directory)
+        device = device or os.environ.get("EMBEDDING_DEVICE")
+        # "torch", "onnx" (exported once to onnx_cache/) or "torch-int8"
+        self.backend = check_backend(
+            backend or os.environ.get("EMBEDDING_BACKEND") or "torch"
+        )
+        # Cache entries and stored hashes are per backend: vectors differ slightly
+        self.embedding_id = embedding_id(self.model_name, self.backend)
+        # Best config from `main.py autotune` for this model and host CPU;
+        # explicit arguments and env vars still win. EMBEDDING_AUTOTUNE=0 ignores it
+        if autotune is None:
+            autotune = os.environ.get("EMBEDDING_AUTOTUNE", "1").lower() not in {
+                "0",
+                "false",
+                "no",
+            }
+        self.tuned_config = load_tuned_config(self.embedding_id) if autotune else None
+        tuned = self.tuned_config or {}
+        # Padded tokens per encoder batch (length-bucketed); 0 = fixed-size batches
+        self.token_budget = int(
+            token_budget
+            if token_budget is not None
+            else os.environ.get("EMBEDDING_TOKEN_BUDGET")
+            or tuned.get("token_budget")
+            or 8192
+        )
+        # encode_workers > 1 (or EMBEDDING_WORKERS) encodes in a persistent
+        # process pool; otherwise one in-process model from the shared registry
+        workers = int(encode_workers or os.environ.get("EMBEDDING_WORKERS") or 1)
+        if embedder is None and workers > 1:
+            embedder = get_encoder_pool(
+                self.model_name,
+                workers,
+                device=device,
+                token_budget=self.token_budget or None,
+                backend=self.backend,
+            )
+        # Tuned torch threads apply around this engine's in-process encodes
+        # only; pools size their own and onnxruntime ignores torch's setting
+        self.encode_threads: int | None = None
+        if embedder is None:
+            embedder = get_embedder(self.model_name, device, self.backend)
+            if self.backend != "onnx" and not os.environ.get("OMP_NUM_THREADS"):
+                self.encode_threads = tuned.get("threads")
+        self.embedder = embedder
+        # "chroma" (persistent HNSW) or "memory" (exact in-process search)
+        self.vector_backend = (
+            vector_backend or os.environ.get("VECTOR_BACKEND") or "chroma"
+        )
+        # "float32", "float16" or "int8" for the in-memory matrix and the cache
+        self.precision = check_precision(
+            precision or os.environ.get("EMBEDDING_PRECISION") or "float32"
+        )
+        self.store: VectorBackend = create_vector_store(
+            self.vector_backend,
+            persist_directory=persist_directory,
+            precision=self.precision,
+            collection_name=collection_name,
+        )
         self.thresholds = thresholds or Thresholds()
+        self.sync_mode = sync_mode
+        # Content-addressed embedding cache; pass cache_directory=None to disable
+        self.embedding_cache = (
+            EmbeddingCache(
+                cache_directory,
+                max_entries=cache_max_entries,
+                precision=self.precision,
+            )
+            if cache_directory
+            else None
+        )
+        # Stage spans (wall/CPU time, items); ALIGNMENT_TIMINGS=0 turns them off
+        if timings is None:
+            timings = os.environ.get("ALIGNMENT_TIMINGS", "1").lower() not in {
+                "0",
+                "false",
+                "no",
+            }
+        self.timings = StageTimings(enabled=timings)
 
-    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
-        # Ensure plain Python floats (not numpy scalar types) for ChromaDB
-        arr = self.embedder.encode(texts, normalize_embeddings=True)
-        return [[float(x) for x in vec] for vec in arr]
+    def _table(self, actions: ActionsLike) -> ActionTable:
+        if isinstance(actions, ActionTable):
+            return actions
+        with self.timings.span("text_build", items=len(actions)):
+            return ActionTable.from_actions(actions)
 
-    def index_actions(
-        self, actions: List[ActionTask]
-    ) -> Tuple[List[str], List[str], List[List[float]]]:
-        action_ids = [a.id for a in actions]
-        action_docs = [action_to_text(a) for a in actions]
-        action_embs = self._embed_texts(action_docs)
-        metadatas = [
-            {
-                "title": a.title,
-                "owner": a.owner,
-                "start_date": str(a.start_date) if a.start_date else None,
-                "end_date": str(a.end_date) if a.end_date else None,
-            }
-            for a in actions
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # One contiguous float32 matrix from the encoder to the vector store
+        with self.timings.span("encode", items=len(texts)), torch_threads(
+            self.encode_threads
+        ):
+            if self.token_budget and not isinstance(self.embedder, EncoderPool):
+                return encode_bucketed(self.embedder, texts, self.token_budget)
+            arr = self.embedder.encode(texts, normalize_embeddings=True)
+            return np.ascontiguousarray(arr, dtype=np.float32)
+
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embeddings for ``texts`` as an (n, dim) float32 matrix."""
+        if self.embedding_cache is None or not texts:
+            return self._encode(texts)
+        with self.timings.span("cache_lookup", items=len(texts)):
+            cached = self.embedding_cache.get_many_arrays(self.embedding_id, texts)
+        # Encode each distinct missing text once
+        missing = list(dict.fromkeys(t for t, e in zip(texts, cached) if e is None))
+        if not missing:
+            return np.stack(cached)  # type: ignore[arg-type]
+        fresh = self._encode(missing)
+        with self.timings.span("cache_store", items=len(missing)):
+            self.embedding_cache.put_many(self.embedding_id, missing, fresh)
+        if len(missing) == len(texts):
+            return fresh
+        row_of = {t: i for i, t in enumerate(missing)}
+        out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+        for i, (t, e) in enumerate(zip(texts, cached)):
+            out[i] = e if e is not None else fresh[row_of[t]]
+        return out
+
+    def cache_stats(self) -> Dict[str, Any] | None:
+        """Embedding cache hit/miss counters, or None when caching is disabled."""
+        return self.embedding_cache.stats() if self.embedding_cache else None
+
+    def _content_hashes(self, table: ActionTable) -> List[str]:
+        # Model (and backend) is part of the hash so switching forces re-embedding
+        return [
+            hashlib.sha256(
+                json.dumps([self.embedding_id, *row]).encode("utf-8")
+            ).hexdigest()
+            for row in zip(
+                table.documents,
+                table.titles,
+                table.owners,
+                table.start_dates,
+                table.end_dates,
+            )
         ]
-        self.store.upsert_actions(
-            ids=action_ids,
-            documents=action_docs,
-            embeddings=action_embs,
-            metadatas=metadatas,
-        )
-        return action_ids, action_docs, action_embs
+
+    def _sync_mode(self, sync_mode: str | None) -> str:
+        mode = sync_mode or self.sync_mode
+        if mode not in {"incremental", "full"}:
+            raise ValueError(f"Unknown sync_mode: {mode!r}")
+        return mode
+
+    def _write_actions(
+        self, actions: ActionsLike, stored: Dict[str, str] | None
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """Embed and upsert ``actions``; with ``stored`` hashes, only changed ones."""
+        table = self._table(actions)
+        with self.timings.span("content_hash", items=len(table)):
+            table.content_hashes = self._content_hashes(table)
+
+        if stored is not None:
+            table = table.take(
+                [
+                    i
+                    for i, (a_id, h) in enumerate(zip(table.ids, table.content_hashes))
+                    if stored.get(a_id) != h
+                ]
+            )
+
+        if not len(table):
+            return [], [], np.zeros((0, 0), dtype=np.float32)
+        table.embeddings = self._embed_texts(table.documents)
+        with self.timings.span("store_upsert", items=len(table)):
+            self.store.upsert_table(table)
+        return table.ids, table.documents, table.embeddings
+
+    def index_actions(
+        self, actions: ActionsLike, sync_mode: str | None = None
+    ) -> Tuple[List[str], List[str], np.ndarray]:
+        """Embed and store actions in the vector store.
+
+        sync_mode:
+        - "incremental": only added/changed actions (by content hash) are
+          re-embedded, and stored actions missing from ``actions`` are deleted
+        - "full": re-embed and upsert every action, never delete
+
+        Returns the ids, documents and embeddings that were written.
+        """
+        stored: Dict[str, str] | None = None
+        if self._sync_mode(sync_mode) == "incremental":
+            actions = self._table(actions)
+            with self.timings.span("store_read") as span:
+                stored = self.store.get_content_hashes()
+                span.items = len(stored)
+            current = set(actions.ids)
+            stale = [i for i in stored if i not in current]
+            if stale:
+                with self.timings.span("store_delete", items=len(stale)):
+                    self.store.delete_actions(stale)
+        return self._write_actions(actions, stored)
+
+    def index_action_batches(
+        self, batches: Iterable[ActionsLike], sync_mode: str | None = None
+    ) -> int:
+        """Index actions arriving in chunks (e.g. from ``iter_action_batches``).
+
+        Same semantics as ``index_actions`` over the concatenated batches, but
+        only one batch is held in memory at a time. Stale actions are deleted
+        after the last batch. Returns the number of actions written.
+        """
+        stored: Dict[str, str] | None = None
+        if self._sync_mode(sync_mode) == "incremental":
+            with self.timings.span("store_read") as span:
+                stored = self.store.get_content_hashes()
+                span.items = len(stored)
+        seen: set[str] = set()
+        written = 0
+        for batch in batches:
+            table = self._table(batch)
+            seen.update(table.ids)
+            written += len(self._write_actions(table, stored)[0])
+        if stored is not None:
+            stale = [i for i in stored if i not in seen]
+            if stale:
+                with self.timings.span("store_delete", items=len(stale)):
+                    self.store.delete_actions(stale)
+        return written
 
     def _label_for_score(self, score: float) -> str:
         if score >= self.thresholds.strong:
@@ -70,68 +285,164 @@ class AlignmentEngine:
             return "Medium"
         return "Weak"
 
+    def similarity_matrix(
+        self,
+        strategies: List[StrategicObjective],
+        actions: ActionsLike,
+        floor: float = 0.3,
+        block_size: int = 2048,
+    ) -> SparseSimilarity:
+        """Full strategy × action similarities above ``floor`` (sparse, blockwise).
+
+        Embeddings already present on an ActionTable are used as-is.
+        """
+        table = self._table(actions)
+        with self.timings.span("text_build", items=len(strategies)):
+            s_texts = [strategy_to_text(s) for s in strategies]
+        s_embs = self._embed_texts(s_texts)
+        a_embs = (
+            table.embeddings
+            if table.embeddings is not None
+            else self._embed_texts(table.documents)
+        )
+        with self.timings.span("similarity", items=len(strategies) * len(table)):
+            return compute_sparse_similarity(
+                s_embs,
+                a_embs,
+                strategy_ids=[s.id for s in strategies],
+                action_ids=table.ids,
+                floor=floor,
+                block_size=block_size,
+            )
+
     def align(
         self,
         strategies: List[StrategicObjective],
-        actions: List[ActionTask],
+        actions: ActionsLike | None,
         top_k: int = 5,
+        mode: str = "top_k",
+        similarity_floor: float = 0.3,
+        block_size: int = 2048,
     ) -> Dict[str, Any]:
-        # Ensure index
-        self.index_actions(actions)
-
-        strategy_results: List[Dict[str, Any]] = []
-        avg_scores: List[float] = []
-        strong_counts: List[int] = []
-
-        for s in strategies:
-            s_text = strategy_to_text(s)
-            s_emb = self._embed_texts([s_text])[0]
-            matches = self.store.query_by_embedding(s_emb, top_k=top_k)
-
-            # Prepare match details with labels
-            match_details: List[Dict[str, Any]] = []
-            for m in matches:
-                label = self._label_for_score(m["similarity"])
-                meta = m.get("metadata", {}) or {}
-                match_details.append(
-                    {
-                        "action_id": m["id"],
-                        "title": meta.get("title"),
-                        "owner": meta.get("owner"),
-                        "start_date": meta.get("start_date"),
-                        "end_date": meta.get("end_date"),
-                        "similarity": m["similarity"],
-                        "alignment_label": label,
-                    }
-                )
+        """Align strategies to actions.
 
-            # Strategy-wise average: top 3 similarities
-            top3 = sorted([m["similarity"] for m in matches], reverse=True)[:3]
-            avg = sum(top3) / max(1, len(top3))
-            avg_scores.append(avg)
+        mode:
+        - "top_k": index actions in the vector store and retrieve top_k per strategy
+        - "matrix": compute every strategy × action similarity above
+          ``similarity_floor`` without the store; the sparse matrix and the
+          orphan actions are attached to the result and top matches are
+          derived from it
 
-            strong_count = sum(
-                1 for m in match_details if m["alignment_label"] == "Strong"
+        Pass ``actions=None`` in "top_k" mode to query a store that was already
+        populated, e.g. with ``index_action_batches``.
+
+        Stage timings collected since the previous ``align`` call (including
+        any separate indexing) are attached under ``timings`` and then reset.
+        """
+        with self.timings.span("align_total", items=len(strategies)):
+            result = self._align(
+                strategies, actions, top_k, mode, similarity_floor, block_size
             )
-            strong_counts.append(strong_count)
-
-            strategy_results.append(
-                {
-                    "strategy_id": s.id,
-                    "strategy_title": s.title,
-                    "avg_top3_similarity": avg,
-                    "alignment_label": self._label_for_score(avg),
-                    "top_matches": match_details,
-                }
+        if self.timings.enabled:
+            result["timings"] = self.timings.as_dict()
+            self.timings.reset()
+        return result
+
+    def _align(
+        self,
+        strategies: List[StrategicObjective],
+        actions: ActionsLike | None,
+        top_k: int,
+        mode: str,
+        similarity_floor: float,
+        block_size: int,
+    ) -> Dict[str, Any]:
+        matrix: SparseSimilarity | None = None
+        if mode == "matrix":
+            if actions is None:
+                raise ValueError("mode='matrix' requires the list of actions")
+            table = self._table(actions)
+            matrix = self.similarity_matrix(
+                strategies, table, floor=similarity_floor, block_size=block_size
             )
+            row_of = {a_id: i for i, a_id in enumerate(table.ids)}
+            all_matches = [
+                [
+                    {
+                        "id": a_id,
+                        "similarity": sim,
+                        "metadata": table.metadata(row_of[a_id]),
+                    }
+                    for a_id, sim in row
+                ]
+                for row in matrix.top_k(top_k)
+            ]
+        elif mode == "top_k":
+            # Ensure index
+            if actions is not None:
+                self.index_actions(actions)
+            # Encode all strategies in one batch and retrieve with one multi-query call
+            with self.timings.span("text_build", items=len(strategies)):
+                s_texts = [strategy_to_text(s) for s in strategies]
+            s_embs = self._embed_texts(s_texts)
+            with self.timings.span("query", items=len(strategies)):
+                all_matches = self.store.query_by_embeddings(s_embs, top_k=top_k)
+        else:
+            raise ValueError(f"Unknown alignment mode: {mode!r}")
+
+        with self.timings.span("scoring", items=len(strategies)):
+            strategy_results: List[Dict[str, Any]] = []
+            avg_scores: List[float] = []
+            strong_counts: List[int] = []
+
+            for s, matches in zip(strategies, all_matches):
+                # Prepare match details with labels
+                match_details: List[Dict[str, Any]] = []
+                for m in matches:
+                    label = self._label_for_score(m["similarity"])
+                    meta = m.get("metadata", {}) or {}
+                    match_details.append(
+                        {
+                            "action_id": m["id"],
+                            "title": meta.get("title"),
+                            "owner": meta.get("owner"),
+                            "start_date": meta.get("start_date"),
+                            "end_date": meta.get("end_date"),
+                            "similarity": m["similarity"],
+                            "alignment_label": label,
+                        }
+                    )
+
+                # Strategy-wise average: top 3 similarities
+                top3 = sorted([m["similarity"] for m in matches], reverse=True)[:3]
+                avg = sum(top3) / max(1, len(top3))
+                avg_scores.append(avg)
+
+                strong_count = sum(
+                    1 for m in match_details if m["alignment_label"] == "Strong"
+                )
+                strong_counts.append(strong_count)
+
+                strategy_results.append(
+                    {
+                        "strategy_id": s.id,
+                        "strategy_title": s.title,
+                        "avg_top3_similarity": avg,
+                        "alignment_label": self._label_for_score(avg),
+                        "top_matches": match_details,
+                    }
+                )
 
-        overall = (sum(avg_scores) / max(1, len(avg_scores))) * 100.0
-        coverage = (
-            sum(1 for c in strong_counts if c >= 2) / max(1, len(strategies))
-        ) * 100.0
+            overall = (sum(avg_scores) / max(1, len(avg_scores))) * 100.0
+            coverage = (
+                sum(1 for c in strong_counts if c >= 2) / max(1, len(strategies))
+            ) * 100.0
 
-        return {
+        result: Dict[str, Any] = {
             "model": self.model_name,
+            "embedding_backend": self.backend,
+            "vector_backend": self.vector_backend,
+            "precision": self.precision,
             "thresholds": {
                 "strong": self.thresholds.strong,
                 "medium": self.thresholds.medium,
@@ -139,4 +450,9 @@ class AlignmentEngine:
             "overall_score": round(overall, 2),
             "coverage_percent": round(coverage, 2),
             "strategy_results": strategy_results,
+            "embedding_cache": self.cache_stats(),
         }
+        if matrix is not None:
+            result["similarity_matrix"] = matrix.to_dict()
+            result["orphan_actions"] = matrix.orphan_actions(self.thresholds.medium)
+        return result
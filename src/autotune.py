@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .batching import encode_bucketed
+
+DEFAULT_BUDGETS = (2048, 4096, 8192, 16384, 32768)
+
+
+def autotune_path() -> Path:
+    """Where tuned encoder configs live (env EMBEDDING_AUTOTUNE_PATH)."""
+    return Path(
+        os.environ.get("EMBEDDING_AUTOTUNE_PATH")
+        or os.path.join("autotune_cache", "encoder_configs.json")
+    )
+
+
+def cpu_signature() -> str:
+    """Stable identifier of the host CPU: architecture, model name, core count."""
+    model = platform.processor() or ""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    model = line.split(":", 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    raw = f"{platform.machine()}|{model}|{os.cpu_count()}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _config_key(model_name: str) -> str:
+    return f"{model_name}|{cpu_signature()}"
+
+
+def _read_all(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def load_tuned_config(
+    model_name: str, path: str | Path | None = None
+) -> Optional[Dict[str, Any]]:
+    """Best config saved for (model, this CPU), or None if never tuned here."""
+    return _read_all(Path(path) if path else autotune_path()).get(_config_key(model_name))
+
+
+def save_tuned_config(
+    model_name: str, config: Dict[str, Any], path: str | Path | None = None
+) -> Path:
+    """Persist ``config`` for (model, this CPU), keeping other entries."""
+    p = Path(path) if path else autotune_path()
+    configs = _read_all(p)
+    configs[_config_key(model_name)] = config
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text(json.dumps(configs, indent=2, sort_keys=True), encoding="utf-8")
+    return p
+
+
+_THREADS_LOCK = threading.RLock()
+
+
+@contextmanager
+def torch_threads(threads: int | None) -> Iterator[None]:
+    """Run the block with torch intra-op threads set to ``threads``, then restore.
+
+    torch's thread count is process-wide, so such blocks are serialized; a
+    no-op when ``threads`` is unset or torch is not loaded.
+    """
+    torch = sys.modules.get("torch")
+    if not threads or torch is None:
+        yield
+        return
+    with _THREADS_LOCK:
+        previous = torch.get_num_threads()
+        torch.set_num_threads(int(threads))
+        try:
+            yield
+        finally:
+            torch.set_num_threads(previous)
+
+
+def _thread_candidates() -> List[int]:
+    cpus = os.cpu_count() or 1
+    out = {1, cpus}
+    n = 2
+    while n < cpus:
+        out.add(n)
+        n *= 2
+    return sorted(out)
+
+
+def autotune(
+    embedder: Any,
+    texts: Sequence[str],
+    threads: Sequence[int] | None = None,
+    budgets: Sequence[int] = DEFAULT_BUDGETS,
+    sample_size: int = 512,
+    repeats: int = 2,
+    seed: int = 0,
+    tune_threads: bool = True,
+) -> Dict[str, Any]:
+    """Micro-benchmark (threads × token budget) on a sample of ``texts``.
+
+    - The sample is drawn at random so it keeps the plan's length mix
+    - Each configuration gets one warm-up pass, then the best of ``repeats``
+    - Thread counts are only varied when torch is loaded and ``tune_threads``
+      is set (onnxruntime fixes its threads when the session is created)
+
+    Returns {"best": {...}, "trials": [...]} with texts/s per configuration.
+    """
+    texts = list(texts)
+    rng = random.Random(seed)
+    sample = rng.sample(texts, min(sample_size, len(texts)))
+    thread_options: List[Optional[int]] = (
+        list(threads or _thread_candidates())
+        if tune_threads and "torch" in sys.modules
+        else [None]
+    )
+    trials: List[Dict[str, Any]] = []
+    for n_threads in thread_options:
+        with torch_threads(n_threads):
+            for budget in budgets:
+                encode_bucketed(embedder, sample[: max(1, len(sample) // 8)], budget)
+                best = float("inf")
+                for _ in range(max(1, repeats)):
+                    start = time.perf_counter()
+                    encode_bucketed(embedder, sample, budget)
+                    best = min(best, time.perf_counter() - start)
+                trials.append(
+                    {
+                        "threads": n_threads,
+                        "token_budget": int(budget),
+                        "seconds": round(best, 4),
+                        "texts_per_s": round(len(sample) / best, 2) if best else None,
+                    }
+                )
+
+    winner = max(trials, key=lambda t: t["texts_per_s"] or 0.0)
+    return {
+        "best": {
+            **winner,
+            "sample_size": len(sample),
+            "cpu_signature": cpu_signature(),
+            "tuned_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "trials": trials,
+    }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Any, List, Sequence
+
+import numpy as np
+
+
+def _tokenizer_of(model: Any) -> Any:
+    """HF tokenizer of a SentenceTransformer (or a wrapper holding one), if any."""
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        tokenizer = getattr(getattr(model, "model", None), "tokenizer", None)
+    return tokenizer if callable(tokenizer) else None
+
+
+def _max_seq_length(model: Any) -> int | None:
+    for obj in (model, getattr(model, "model", None)):
+        value = getattr(obj, "max_seq_length", None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def token_lengths(model: Any, texts: Sequence[str]) -> np.ndarray:
+    """Tokenized length of each text, including special tokens.
+
+    Uses the model's own (fast) tokenizer with its truncation limit when
+    available, otherwise approximates ~4 characters per token. Models with
+    their own ``token_lengths`` (``SharedEmbedder``) measure under their
+    lock, since HF fast tokenizers are not thread-safe.
+    """
+    own = getattr(model, "token_lengths", None)
+    if callable(own):
+        return own(texts)
+    tokenizer = _tokenizer_of(model)
+    if tokenizer is not None:
+        max_len = _max_seq_length(model)
+        ids = tokenizer(
+            list(texts),
+            add_special_tokens=True,
+            truncation=max_len is not None,
+            max_length=max_len,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )["input_ids"]
+        return np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(texts))
+    return np.fromiter(
+        (len(t) // 4 + 2 for t in texts), dtype=np.int64, count=len(texts)
+    )
+
+
+def token_budget_batches(
+    lengths: Sequence[int], max_tokens: int, max_batch_size: int = 512
+) -> List[np.ndarray]:
+    """Group text indices into length-sorted batches under a padded-token budget.
+
+    Each batch holds texts of similar length and satisfies
+    ``len(batch) * longest_in_batch <= max_tokens`` (a single text longer
+    than the budget gets a batch of its own), so short texts share large
+    batches and long texts small ones.
+    """
+    lens = np.asarray(lengths, dtype=np.int64)
+    order = np.argsort(-lens, kind="stable")
+    batches: List[np.ndarray] = []
+    start = 0
+    while start < len(order):
+        # Sorted longest first, so the first text sets the padded width
+        width = max(1, int(lens[order[start]]))
+        size = max(1, min(max_batch_size, max_tokens // width))
+        batches.append(order[start : start + size])
+        start += size
+    return batches
+
+
+def padded_tokens(lengths: Sequence[int], batches: Sequence[np.ndarray]) -> int:
+    """Total tokens processed, padding included, for ``batches`` of ``lengths``."""
+    lens = np.asarray(lengths, dtype=np.int64)
+    return int(sum(len(b) * int(lens[b].max()) for b in batches if len(b)))
+
+
+def encode_bucketed(
+    model: Any,
+    texts: Sequence[str],
+    max_tokens: int,
+    normalize_embeddings: bool = True,
+    max_batch_size: int = 512,
+) -> np.ndarray:
+    """Encode in token-budget batches and scatter rows back to input order."""
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, 0), dtype=np.float32)
+    lengths = token_lengths(model, texts)
+    out: np.ndarray | None = None
+    for batch in token_budget_batches(lengths, max_tokens, max_batch_size):
+        embs = model.encode(
+            [texts[i] for i in batch],
+            batch_size=len(batch),
+            normalize_embeddings=normalize_embeddings,
+        )
+        embs = np.asarray(embs, dtype=np.float32)
+        if out is None:
+            out = np.empty((len(texts), embs.shape[1]), dtype=np.float32)
+        out[batch] = embs
+    assert out is not None
+    return out
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .kv_cache import count_rows, evict_lru, open_lru_table, touch_keys
+from .quantization import check_precision, dequantize, quantize
+from .text_utils import clean_text
+
+
+_SQL_CHUNK = 500  # stay well below SQLite's bound-parameter limit
+
+
+def _encode_vector(vec: np.ndarray, precision: str) -> bytes:
+    data, scales = quantize(vec, precision)
+    # int8 blobs carry their float32 scale in front of the codes
+    prefix = scales.tobytes() if scales is not None else b""
+    return prefix + data.tobytes()
+
+
+def _decode_vector(blob: bytes, precision: str) -> np.ndarray:
+    if precision == "float32":
+        return np.frombuffer(blob, dtype=np.float32)
+    if precision == "float16":
+        return np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+    scale = np.frombuffer(blob[:4], dtype=np.float32)
+    codes = np.frombuffer(blob[4:], dtype=np.int8).reshape(1, -1)
+    return dequantize(codes, scale)[0]
+
+
+def text_key(model_name: str, text: str, precision: str = "float32") -> str:
+    """Content address for an embedding: model, precision, SHA-256 of normalized text.
+
+    Precision is part of the key so a lossy (int8/float16) entry is never
+    served to an engine that asked for float32 vectors.
+    """
+    digest = hashlib.sha256(clean_text(text).encode("utf-8")).hexdigest()
+    return f"{model_name}:{precision}:{digest}"
+
+
+class EmbeddingCache:
+    """Persistent, content-addressed cache of text embeddings.
+
+    - Entries are keyed by (model name, precision, normalized text hash)
+    - Vectors are stored as float32 blobs in a single SQLite file, or as
+      float16 / int8 (+ per-vector scale) blobs with ``precision``; a cache
+      only reads back entries written at its own precision
+    - Least recently used entries are evicted once ``max_entries`` is exceeded
+    - ``hits`` / ``misses`` counters report cache effectiveness
+    """
+
+    def __init__(
+        self,
+        directory: str | Path = "embedding_cache",
+        max_entries: int = 100_000,
+        precision: str = "float32",
+    ) -> None:
+        self.precision = check_precision(precision)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / "embeddings.sqlite3"
+        self.max_entries = max(1, int(max_entries))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = open_lru_table(
+            self.path,
+            "embeddings",
+            "dim INTEGER NOT NULL, vector BLOB NOT NULL, last_used INTEGER NOT NULL",
+        )
+        row = self._conn.execute("SELECT MAX(last_used) FROM embeddings").fetchone()
+        self._clock = int(row[0] or 0)
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(
+        self, model_name: str, texts: Sequence[str]
+    ) -> List[Optional[List[float]]]:
+        """Look up embeddings for ``texts``; missing entries are returned as None."""
+        return [
+            v.tolist() if v is not None else None
+            for v in self.get_many_arrays(model_name, texts)
+        ]
+
+    def get_many_arrays(
+        self, model_name: str, texts: Sequence[str]
+    ) -> List[Optional[np.ndarray]]:
+        """Like ``get_many`` but returns float32 arrays (float32 blobs are not copied)."""
+        keys = [text_key(model_name, t, self.precision) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), _SQL_CHUNK):
+                chunk = unique[i : i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({marks})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _decode_vector(blob, self.precision)
+            if found:
+                touch_keys(self._conn, "embeddings", found, self._tick())
+                self._conn.commit()
+            out = [found.get(k) for k in keys]
+            hit_count = sum(1 for v in out if v is not None)
+            self.hits += hit_count
+            self.misses += len(out) - hit_count
+        return out
+
+    def put_many(
+        self, model_name: str, texts: Sequence[str], embeddings: Iterable[Any]
+    ) -> None:
+        """Store embeddings for ``texts`` and evict LRU entries beyond the cap."""
+        with self._lock:
+            stamp = self._tick()
+            rows = []
+            for text, emb in zip(texts, embeddings):
+                vec = np.asarray(emb, dtype=np.float32)
+                rows.append(
+                    (
+                        text_key(model_name, text, self.precision),
+                        int(vec.shape[0]),
+                        _encode_vector(vec, self.precision),
+                        stamp,
+                    )
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            evict_lru(self._conn, "embeddings", self.max_entries)
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return count_rows(self._conn, "embeddings")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "precision": self.precision,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached embeddings and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import atexit
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .batching import encode_bucketed
+from .inference_backends import load_model
+
+ModelFactory = Callable[[str, "str | None"], Any]
+
+_WORKER_MODEL: Any = None
+
+
+def _init_encoder_worker(
+    model_name: str,
+    device: str | None,
+    threads: int,
+    factory: ModelFactory,
+) -> None:
+    """Load the model once per worker, capping intra-op threads first."""
+    global _WORKER_MODEL
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _WORKER_MODEL = factory(model_name, device)
+
+
+def _encode_shard(
+    texts: List[str], batch_size: int, normalize: bool, token_budget: int | None
+) -> np.ndarray:
+    assert _WORKER_MODEL is not None
+    if token_budget:
+        return encode_bucketed(_WORKER_MODEL, texts, token_budget, normalize)
+    arr = _WORKER_MODEL.encode(
+        texts, batch_size=batch_size, normalize_embeddings=normalize
+    )
+    return np.ascontiguousarray(arr, dtype=np.float32)
+
+
+def _resolve_settings(
+    workers: int | None, batch_size: int | None, threads_per_worker: int | None
+) -> Tuple[int, int, int]:
+    cpus = os.cpu_count() or 1
+    n_workers = max(1, int(workers or os.environ.get("EMBEDDING_WORKERS") or cpus))
+    batch = max(1, int(batch_size or os.environ.get("EMBEDDING_BATCH_SIZE") or 64))
+    threads = max(
+        1,
+        int(
+            threads_per_worker
+            or os.environ.get("EMBEDDING_THREADS_PER_WORKER")
+            or cpus // n_workers
+        ),
+    )
+    return n_workers, batch, threads
+
+
+class EncoderPool:
+    """Persistent process pool encoding texts with one model copy per worker.
+
+    - Workers use the "spawn" start method (safe with torch) and load the
+      model once, in the initializer
+    - Texts are split into ``shard_size`` shards; results come back in input order
+    - With ``token_budget``, texts are length-sorted before sharding and each
+      worker batches its shard by padded tokens (see ``batching``)
+    - ``backend`` selects torch, onnx or torch-int8 inference in each worker
+    - ``threads_per_worker`` caps torch/BLAS threads so workers × threads
+      does not oversubscribe the CPU
+    - Exposes ``encode(texts, normalize_embeddings=...)`` like SentenceTransformer,
+      so it can be passed to ``AlignmentEngine(embedder=...)``
+
+    Defaults come from EMBEDDING_WORKERS, EMBEDDING_BATCH_SIZE and
+    EMBEDDING_THREADS_PER_WORKER.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        workers: int | None = None,
+        batch_size: int | None = None,
+        threads_per_worker: int | None = None,
+        device: str | None = None,
+        shard_size: int | None = None,
+        model_factory: ModelFactory | None = None,
+        token_budget: int | None = None,
+        backend: str = "torch",
+    ) -> None:
+        self.model_name = model_name
+        self.backend = backend
+        self.workers, self.batch_size, self.threads_per_worker = _resolve_settings(
+            workers, batch_size, threads_per_worker
+        )
+        self.shard_size = max(1, int(shard_size or self.batch_size * 8))
+        self.token_budget = token_budget
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_encoder_worker,
+            initargs=(
+                model_name,
+                device,
+                self.threads_per_worker,
+                model_factory or functools.partial(load_model, backend=backend),
+            ),
+        )
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        normalize_embeddings: bool = True,
+        batch_size: int | None = None,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        """Encode ``texts`` across the workers; rows follow the input order."""
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        size = batch_size or self.batch_size
+        order = None
+        if self.token_budget:
+            # Similar lengths per shard (character length is a cheap proxy)
+            order = np.argsort([-len(t) for t in texts], kind="stable")
+            texts = [texts[i] for i in order]
+        futures = [
+            self._pool.submit(
+                _encode_shard,
+                texts[i : i + self.shard_size],
+                size,
+                normalize_embeddings,
+                self.token_budget,
+            )
+            for i in range(0, len(texts), self.shard_size)
+        ]
+        embs = np.concatenate([f.result() for f in futures])
+        if order is None:
+            return embs
+        out = np.empty_like(embs)
+        out[order] = embs
+        return out
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "EncoderPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+_POOLS: Dict[Tuple[Any, ...], EncoderPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_encoder_pool(
+    model_name: str,
+    workers: int,
+    batch_size: int | None = None,
+    threads_per_worker: int | None = None,
+    device: str | None = None,
+    token_budget: int | None = None,
+    backend: str = "torch",
+) -> EncoderPool:
+    """Process-wide pool for these settings, started once and reused."""
+    settings = _resolve_settings(workers, batch_size, threads_per_worker)
+    key = (model_name, device, token_budget, backend, *settings)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = EncoderPool(
+                model_name,
+                *settings,
+                device=device,
+                token_budget=token_budget,
+                backend=backend,
+            )
+            _POOLS[key] = pool
+        return pool
+
+
+def shutdown_encoder_pools() -> None:
+    """Stop every pool started by ``get_encoder_pool``."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(shutdown_encoder_pools)
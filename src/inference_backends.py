@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .quantization import _top_k
+
+BACKENDS = ("torch", "onnx", "torch-int8")
+ONNX_FORMAT = "sentence-onnx/1"
+
+
+def check_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend: {backend!r}; expected one of {BACKENDS}"
+        )
+    return backend
+
+
+def embedding_id(model_name: str, backend: str = "torch") -> str:
+    """Key for caches/stored hashes: backends give slightly different vectors."""
+    return model_name if backend == "torch" else f"{model_name}#{backend}"
+
+
+def export_directory(model_name: str) -> Path:
+    """Where the ONNX export of ``model_name`` lives (env EMBEDDING_EXPORT_DIR)."""
+    root = os.environ.get("EMBEDDING_EXPORT_DIR") or "onnx_cache"
+    return Path(root) / re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+
+
+def pool_hidden_states(
+    hidden: np.ndarray, attention_mask: np.ndarray, mode: str
+) -> np.ndarray:
+    """SentenceTransformer pooling ("mean", "cls" or "max") over token states."""
+    mask = attention_mask.astype(np.float32)[:, :, None]
+    if mode == "mean":
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+    if mode == "cls":
+        return hidden[:, 0]
+    if mode == "max":
+        return np.where(mask > 0, hidden, -1e9).max(axis=1)
+    raise ValueError(f"Unsupported pooling mode {mode!r}")
+
+
+def _load_torch(model_name: str, device: str | None) -> Any:
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name, device=device)
+
+
+def _load_torch_int8(model_name: str, device: str | None) -> Any:
+    """Full-precision model with every nn.Linear dynamically quantized to int8."""
+    if device not in (None, "cpu"):
+        raise ValueError("torch-int8 dynamic quantization runs on CPU only")
+    import torch
+
+    model = _load_torch(model_name, "cpu")
+    torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+    )
+    return model
+
+
+def export_onnx(model_name: str, directory: str | Path | None = None) -> Path:
+    """Export the transformer of ``model_name`` to ONNX once and cache it.
+
+    Writes ``model.onnx`` (token states out), the tokenizer files and
+    ``export.json`` (pooling mode, max length, normalization). Pooling runs
+    in numpy at encode time, so loading an export needs neither torch nor
+    sentence-transformers. Returns the export directory.
+    """
+    target = Path(directory) if directory else export_directory(model_name)
+    if (target / "export.json").exists():
+        return target
+
+    import torch
+
+    st = _load_torch(model_name, "cpu")
+    modules = list(st)
+    kinds = [type(m).__name__ for m in modules]
+    if kinds[:2] != ["Transformer", "Pooling"] or set(kinds[2:]) - {"Normalize"}:
+        raise ValueError(f"Cannot export {model_name!r}: unsupported modules {kinds}")
+    transformer, pooling = modules[0], modules[1]
+    if pooling.get_pooling_mode_str() not in {"mean", "cls", "max"}:
+        raise ValueError(f"Cannot export {model_name!r}: unsupported pooling")
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["export sample text"], padding=True, return_tensors="pt")
+    input_names = [
+        n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample
+    ]
+
+    class _Hidden(torch.nn.Module):
+        def __init__(self) -> None:
+            super().__init__()
+            self.model = auto_model
+
+        def forward(self, *inputs: Any) -> Any:
+            return self.model(**dict(zip(input_names, inputs)))[0]
+
+    # Export into a sibling temp dir and rename, so a crash never leaves half a cache
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".export-", dir=target.parent))
+    try:
+        with torch.no_grad():
+            torch.onnx.export(
+                _Hidden(),
+                tuple(sample[n] for n in input_names),
+                str(tmp / "model.onnx"),
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    n: {0: "batch", 1: "sequence"}
+                    for n in [*input_names, "last_hidden_state"]
+                },
+                opset_version=14,
+                do_constant_folding=True,
+            )
+        tokenizer.save_pretrained(str(tmp))
+        meta = {
+            "format": ONNX_FORMAT,
+            "model_name": model_name,
+            "input_names": input_names,
+            "pooling": pooling.get_pooling_mode_str(),
+            "max_seq_length": int(st.max_seq_length),
+            "normalize": "Normalize" in kinds,
+        }
+        (tmp / "export.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+        shutil.rmtree(target, ignore_errors=True)
+        tmp.rename(target)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+class OnnxEncoder:
+    """onnxruntime CPU encoder for an ``export_onnx`` directory.
+
+    - Same ``encode(texts, batch_size=..., normalize_embeddings=...)`` shape
+      as SentenceTransformer; rows come back as float32 in input order
+    - Exposes ``tokenizer`` and ``max_seq_length`` so token-budget batching
+      measures lengths with the real tokenizer
+    """
+
+    def __init__(self, directory: str | Path, threads: int | None = None) -> None:
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / "export.json").read_text("utf-8"))
+        if self.meta.get("format") != ONNX_FORMAT:
+            raise ValueError(f"Not an ONNX embedding export: {self.directory}")
+        self.tokenizer = AutoTokenizer.from_pretrained(str(self.directory))
+        self.max_seq_length: int = self.meta["max_seq_length"]
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Encoder pool workers cap OMP_NUM_THREADS; honour it here too
+        threads = threads or os.environ.get("OMP_NUM_THREADS")
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(
+            str(self.directory / "model.onnx"),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def _run(self, texts: List[str], normalize: bool) -> np.ndarray:
+        enc = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {n: enc[n].astype(np.int64) for n in self.meta["input_names"]}
+        (hidden,) = self.session.run(["last_hidden_state"], feeds)
+        out = pool_hidden_states(hidden, feeds["attention_mask"], self.meta["pooling"])
+        if normalize or self.meta["normalize"]:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            out = out / norms
+        return out.astype(np.float32, copy=False)
+
+    def encode(
+        self,
+        texts: Sequence[str],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs: Any,
+    ) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Longest first, like SentenceTransformer, to keep padding low
+        order = np.argsort([-len(t) for t in texts], kind="stable")
+        out: np.ndarray | None = None
+        for i in range(0, len(texts), batch_size):
+            idx = order[i : i + batch_size]
+            embs = self._run([texts[j] for j in idx], normalize_embeddings)
+            if out is None:
+                out = np.empty((len(texts), embs.shape[1]), dtype=np.float32)
+            out[idx] = embs
+        assert out is not None
+        return out
+
+
+def load_model(
+    model_name: str, device: str | None = None, backend: str = "torch"
+) -> Any:
+    """Load ``model_name`` for ``backend``; "onnx" exports on first use."""
+    check_backend(backend)
+    if backend == "torch-int8":
+        return _load_torch_int8(model_name, device)
+    if backend == "onnx":
+        if device not in (None, "cpu"):
+            raise ValueError("The onnx backend runs on CPU only")
+        try:
+            return OnnxEncoder(export_onnx(model_name))
+        except ImportError as exc:
+            raise ImportError(
+                f"The onnx backend needs {exc.name or 'onnxruntime/onnx'}; "
+                "install the pinned versions from requirements.txt"
+            ) from exc
+    return _load_torch(model_name, device)
+
+
+def agreement_report(
+    reference: Any,
+    candidate: Any,
+    reference_queries: Any | None = None,
+    candidate_queries: Any | None = None,
+    top_k: int = 10,
+) -> Dict[str, Any]:
+    """Cosine agreement of ``candidate`` embeddings with ``reference`` ones.
+
+    - ``cosine``: mean/min/p01 cosine between each pair of rows for the same text
+    - ``recall_at_k`` (with queries): mean overlap of the top-k rows each
+      query retrieves under the candidate vs the reference backend
+    """
+
+    def _normalized(arr: Any) -> np.ndarray:
+        mat = np.asarray(arr, dtype=np.float32)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return mat / norms
+
+    ref, cand = _normalized(reference), _normalized(candidate)
+    if ref.shape != cand.shape:
+        raise ValueError(f"Shape mismatch: {ref.shape} vs {cand.shape}")
+    cos = (ref * cand).sum(axis=1)
+    report: Dict[str, Any] = {
+        "texts": int(ref.shape[0]),
+        "cosine": {
+            "mean": round(float(cos.mean()), 6),
+            "min": round(float(cos.min()), 6),
+            "p01": round(float(np.percentile(cos, 1)), 6),
+        },
+    }
+    if reference_queries is not None and candidate_queries is not None:
+        k = max(1, min(int(top_k), ref.shape[0]))
+        exact = _top_k(_normalized(reference_queries) @ ref.T, k)
+        found = _top_k(_normalized(candidate_queries) @ cand.T, k)
+        recall = [
+            len(set(a.tolist()) & set(b.tolist())) / k for a, b in zip(exact, found)
+        ]
+        report["top_k"] = k
+        report["recall_at_k"] = round(float(np.mean(recall)), 6)
+    return report
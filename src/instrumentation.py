@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+
+class _Span:
+    __slots__ = ("_owner", "name", "items", "_wall", "_cpu")
+
+    def __init__(self, owner: "StageTimings", name: str, items: int) -> None:
+        self._owner = owner
+        self.name = name
+        self.items = items
+
+    def __enter__(self) -> "_Span":
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._owner._record(
+            self.name,
+            time.perf_counter() - self._wall,
+            time.process_time() - self._cpu,
+            self.items,
+        )
+
+
+class _NullSpan:
+    """Shared no-op span returned when timings are disabled."""
+
+    __slots__ = ("items",)
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class StageTimings:
+    """Accumulates wall time, CPU time and item counts per named stage.
+
+    - ``with timings.span("encode", items=n):`` records one call of a stage;
+      set ``span.items`` inside the block when the count is known only later
+    - Repeated spans with the same name are summed
+    - When disabled, ``span`` returns a shared no-op object (no clock reads)
+    - CPU time is process-wide, so it includes threads started by the stage
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._stages: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, items: int = 0) -> Any:
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, items)
+
+    def _record(self, name: str, wall: float, cpu: float, items: int) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(name, [0, 0.0, 0.0, 0])
+            stage[0] += 1
+            stage[1] += wall
+            stage[2] += cpu
+            stage[3] += items
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages = {}
+
+    def as_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage totals in first-seen order (JSON-friendly)."""
+        with self._lock:
+            stages = {k: list(v) for k, v in self._stages.items()}
+        return {
+            name: {
+                "calls": int(calls),
+                "wall_seconds": round(wall, 6),
+                "cpu_seconds": round(cpu, 6),
+                "items": int(items),
+                "items_per_s": round(items / wall, 2) if items and wall > 0 else None,
+            }
+            for name, (calls, wall, cpu, items) in stages.items()
+        }
+
+
+_PROMETHEUS_METRICS = [
+    ("wall_seconds", "Wall-clock seconds spent in the stage."),
+    ("cpu_seconds", "Process CPU seconds spent in the stage."),
+    ("items", "Items processed by the stage."),
+    ("calls", "Number of times the stage ran."),
+]
+
+
+def _label_text(labels: Dict[str, Any]) -> str:
+    parts = []
+    for k, v in labels.items():
+        value = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{value}"')
+    return ",".join(parts)
+
+
+def to_prometheus(
+    timings: Dict[str, Dict[str, Any]],
+    prefix: str = "alignment_stage",
+    labels: Dict[str, Any] | None = None,
+) -> str:
+    """Render ``StageTimings.as_dict()`` output in Prometheus text format."""
+    lines: List[str] = []
+    for metric, help_text in _PROMETHEUS_METRICS:
+        name = f"{prefix}_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for stage, values in timings.items():
+            label_text = _label_text({**(labels or {}), "stage": stage})
+            lines.append(f"{name}{{{label_text}}} {values[metric]}")
+    return "\n".join(lines) + "\n"
+
+
+def to_json_lines(timings: Dict[str, Dict[str, Any]], **labels: Any) -> str:
+    """One JSON object per stage, with ``labels`` merged into each line."""
+    return "".join(
+        json.dumps({**labels, "stage": stage, **values}) + "\n"
+        for stage, values in timings.items()
+    )
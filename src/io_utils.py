@@ -1,17 +1,45 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Sequence, Tuple
 
 import json
 from pathlib import Path
 
 import pandas as pd
 
+MANIFEST_NAME = "manifest.json"
+PARQUET_FORMAT = "alignment-parquet/1"
+
+STRATEGY_COLUMNS = [
+    "strategy_id",
+    "strategy_title",
+    "avg_top3_similarity",
+    "alignment_label",
+]
+MATCH_COLUMNS = [
+    "strategy_id",
+    "strategy_title",
+    "rank",
+    "action_id",
+    "title",
+    "owner",
+    "start_date",
+    "end_date",
+    "similarity",
+    "alignment_label",
+]
+
 
 def load_alignment_output(path: str | Path) -> Dict[str, Any]:
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(f"Alignment output not found: {p}")
+    if p.is_dir() or p.name == MANIFEST_NAME:
+        loaded = load_alignment_parquet(p)
+        loaded["strategy_results"] = strategy_results_from_frames(
+            loaded["strategies"], loaded["matches"]
+        )
+        return loaded
     with p.open("r", encoding="utf-8") as f:
         data = json.load(f)
     # Basic shape checks and safe defaults
@@ -89,3 +117,143 @@ def export_csv(df: pd.DataFrame, path: str | Path) -> Path:
     p.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(p, index=False)
     return p
+
+
+# ------------------------- Columnar (Parquet) output -------------------------
+def _columns(records: Sequence[dict], names: Sequence[str]) -> Dict[str, List[Any]]:
+    return {n: [r.get(n) for r in records] for n in names}
+
+
+def write_alignment_parquet(
+    payload: Dict[str, Any], directory: str | Path, compression: str = "zstd"
+) -> Path:
+    """Write an alignment payload as Parquet tables plus a small JSON manifest.
+
+    - ``strategies.parquet``: one row per strategy result
+    - ``matches.parquet``: one row per (strategy, top match)
+    - ``similarity.parquet``: sparse matrix entries (matrix mode only)
+    - ``manifest.json``: everything else (metrics, recommendations, file list)
+
+    Requires ``pyarrow``. Returns the manifest path.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    result = dict(payload.get("result") or {})
+    strategy_results = result.pop("strategy_results", []) or []
+    matrix = result.pop("similarity_matrix", None)
+
+    match_rows: List[dict] = []
+    for s in strategy_results:
+        for i, m in enumerate(s.get("top_matches") or []):
+            match_rows.append(
+                {
+                    **m,
+                    "strategy_id": s.get("strategy_id"),
+                    "strategy_title": s.get("strategy_title"),
+                    "rank": i + 1,
+                }
+            )
+
+    tables: Dict[str, Any] = {
+        "strategies": pa.table(_columns(strategy_results, STRATEGY_COLUMNS)),
+        "matches": pa.table(_columns(match_rows, MATCH_COLUMNS)),
+    }
+    if matrix is not None:
+        indptr = matrix["indptr"]
+        strategy_ids = matrix["strategy_ids"]
+        action_ids = matrix["action_ids"]
+        tables["similarity"] = pa.table(
+            {
+                "strategy_id": [
+                    strategy_ids[i]
+                    for i in range(len(indptr) - 1)
+                    for _ in range(indptr[i + 1] - indptr[i])
+                ],
+                "action_id": [action_ids[j] for j in matrix["indices"]],
+                "similarity": pa.array(matrix["values"], type=pa.float32()),
+            }
+        )
+        result["similarity_matrix"] = {k: matrix[k] for k in ("shape", "floor")}
+
+    files: Dict[str, Dict[str, Any]] = {}
+    for name, table in tables.items():
+        file_name = f"{name}.parquet"
+        pq.write_table(table, out / file_name, compression=compression)
+        files[name] = {"path": file_name, "rows": table.num_rows}
+
+    manifest = {
+        "format": PARQUET_FORMAT,
+        "files": files,
+        **{k: v for k, v in payload.items() if k != "result"},
+        "result": result,
+    }
+    manifest_path = out / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest_path
+
+
+def load_alignment_parquet(
+    path: str | Path,
+    strategy_columns: Sequence[str] | None = None,
+    match_columns: Sequence[str] | None = None,
+    include_similarity: bool = False,
+) -> Dict[str, Any]:
+    """Load output written by ``write_alignment_parquet``.
+
+    ``path`` is the output directory or its manifest. Only the requested
+    columns are read from each Parquet file (None = all columns).
+    """
+    import pyarrow.parquet as pq
+
+    p = Path(path)
+    directory = p.parent if p.name == MANIFEST_NAME else p
+    manifest_path = directory / MANIFEST_NAME
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"Alignment manifest not found: {manifest_path}")
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if manifest.get("format") != PARQUET_FORMAT:
+        raise ValueError(
+            f"Unsupported alignment output format: {manifest.get('format')!r}"
+        )
+
+    def _read(name: str, columns: Sequence[str] | None) -> pd.DataFrame:
+        entry = manifest["files"][name]
+        cols = list(columns) if columns is not None else None
+        return pq.read_table(directory / entry["path"], columns=cols).to_pandas()
+
+    result = manifest.get("result", {})
+    loaded: Dict[str, Any] = {
+        "raw": manifest,
+        "result": result,
+        "metrics": result.get("metrics", {}),
+        "strategies": _read("strategies", strategy_columns),
+        "matches": _read("matches", match_columns),
+    }
+    if include_similarity and "similarity" in manifest["files"]:
+        loaded["similarity"] = _read("similarity", None)
+    return loaded
+
+
+def strategy_results_from_frames(
+    strategies: pd.DataFrame, matches: pd.DataFrame
+) -> List[dict]:
+    """Rebuild the nested ``strategy_results`` list from the columnar tables."""
+    by_strategy: Dict[Any, List[dict]] = {}
+    if "strategy_id" in matches.columns:
+        match_cols = [
+            c
+            for c in matches.columns
+            if c not in {"strategy_id", "strategy_title", "rank"}
+        ]
+        ordered = matches.sort_values("rank") if "rank" in matches.columns else matches
+        for sid, rec in zip(
+            ordered["strategy_id"], ordered[match_cols].to_dict("records")
+        ):
+            by_strategy.setdefault(sid, []).append(rec)
+    results = strategies.to_dict("records")
+    for r in results:
+        r["top_matches"] = by_strategy.get(r.get("strategy_id"), [])
+    return results
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+def open_lru_table(path: Path, table: str, columns: str) -> sqlite3.Connection:
+    """Open (or create) a WAL SQLite file holding one LRU-managed ``table``.
+
+    ``columns`` is the column list after ``key TEXT PRIMARY KEY``; it must
+    include a ``last_used`` column, which gets an index for eviction.
+    """
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, {columns})"
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_last_used ON {table} (last_used)"
+    )
+    conn.commit()
+    return conn
+
+
+def touch_keys(
+    conn: sqlite3.Connection, table: str, keys: Iterable[str], stamp: float
+) -> None:
+    """Mark ``keys`` as used at ``stamp`` (the caller commits)."""
+    conn.executemany(
+        f"UPDATE {table} SET last_used = ? WHERE key = ?", [(stamp, k) for k in keys]
+    )
+
+
+def count_rows(conn: sqlite3.Connection, table: str) -> int:
+    return int(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0])
+
+
+def evict_lru(conn: sqlite3.Connection, table: str, max_entries: int) -> None:
+    """Delete the least recently used rows beyond ``max_entries`` (the caller commits)."""
+    excess = count_rows(conn, table) - max_entries
+    if excess > 0:
+        conn.execute(
+            f"DELETE FROM {table} WHERE key IN ("
+            f" SELECT key FROM {table} ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+
+
+class JsonCache:
+    """Persistent key → JSON value cache with TTL and LRU eviction.
+
+    - Backed by a single SQLite file (safe to share across threads)
+    - Entries older than ``ttl_seconds`` are treated as missing (None = no TTL)
+    - Least recently used entries are evicted beyond ``max_entries``
+    - ``hits`` / ``misses`` counters report cache effectiveness
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = open_lru_table(
+            self.path,
+            "entries",
+            "value TEXT NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL",
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None when missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.ttl_seconds is not None:
+                if now - float(row[1]) > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    self._conn.commit()
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+            touch_keys(self._conn, "entries", [key], now)
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value and evict beyond the size cap."""
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, created_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        evict_lru(self._conn, "entries", self.max_entries)
+
+    def invalidate(self, key: str) -> bool:
+        """Remove one entry; returns True if it existed."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+            return cur.rowcount > 0
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Remove every entry whose key starts with ``prefix``; returns the count."""
+        with self._lock:
+            keys = [
+                k
+                for (k,) in self._conn.execute("SELECT key FROM entries").fetchall()
+                if k.startswith(prefix)
+            ]
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in keys])
+            self._conn.commit()
+            return len(keys)
+
+    def clear(self) -> None:
+        """Drop every entry and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return count_rows(self._conn, "entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
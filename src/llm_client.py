@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+
+    ``reserve`` always succeeds immediately and returns how long the caller
+    must wait before using the reservation, so the same bucket works for
+    blocking (``time.sleep``) and async (``asyncio.sleep``) callers.
+    """
+
+    def __init__(self, rate_per_minute: float) -> None:
+        self.capacity = max(1.0, float(rate_per_minute))
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for one provider."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float) -> None:
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def _reserve(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def acquire(self, tokens: int) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def estimate_tokens(messages: Iterable[Dict[str, Any]], completion_tokens: int = 800) -> int:
+    """Rough prompt + completion token estimate (~4 characters per token)."""
+    chars = sum(len(str(m.get("content") or "")) for m in messages)
+    return chars // 4 + completion_tokens
+
+
+_LIMITER: Optional[RateLimiter] = None
+_CLIENTS: Dict[Tuple[Optional[str], Optional[str]], Any] = {}
+_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter configured by OPENAI_RPM / OPENAI_TPM."""
+    global _LIMITER
+    with _LOCK:
+        if _LIMITER is None:
+            _LIMITER = RateLimiter(
+                requests_per_minute=float(os.environ.get("OPENAI_RPM") or 500),
+                tokens_per_minute=float(os.environ.get("OPENAI_TPM") or 200_000),
+            )
+        return _LIMITER
+
+
+def get_client(api_key: Optional[str], base_url: Optional[str] = None) -> Any:
+    """Shared synchronous OpenAI client (one HTTP connection pool per endpoint).
+
+    Retries are disabled on the client itself; ``call_with_retries`` owns them.
+    """
+    key = (api_key, base_url)
+    with _LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            from openai import OpenAI  # type: ignore
+
+            client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            _CLIENTS[key] = client
+        return client
+
+
+def _max_retries() -> int:
+    return int(os.environ.get("OPENAI_MAX_RETRIES") or 5)
+
+
+def _retry_delay(exc: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying ``exc``, or None if it is not retryable."""
+    status = getattr(exc, "status_code", None)
+    name = type(exc).__name__
+    if status not in _RETRYABLE_STATUS and name not in {
+        "APIConnectionError",
+        "APITimeoutError",
+    }:
+        return None
+    response = getattr(exc, "response", None)
+    retry_after = None
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            retry_after = None
+    # Exponential backoff with full jitter, floored by any server hint
+    backoff = random.uniform(0, min(60.0, 0.5 * 2**attempt))
+    return max(backoff, retry_after or 0.0)
+
+
+def call_with_retries(
+    fn: Callable[[], T],
+    estimated_tokens: int,
+    limiter: Optional[RateLimiter] = None,
+    max_retries: Optional[int] = None,
+) -> T:
+    """Run ``fn`` under the rate limiter, retrying 429/5xx with jittered backoff."""
+    limiter = limiter or get_rate_limiter()
+    retries = _max_retries() if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        limiter.acquire(estimated_tokens)
+        try:
+            return fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt >= retries:
+                raise
+            attempt += 1
+            time.sleep(delay)
+
+
+async def acall_with_retries(
+    fn: Callable[[], Awaitable[T]],
+    estimated_tokens: int,
+    limiter: Optional[RateLimiter] = None,
+    max_retries: Optional[int] = None,
+) -> T:
+    """Async variant of ``call_with_retries``."""
+    limiter = limiter or get_rate_limiter()
+    retries = _max_retries() if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        await limiter.aacquire(estimated_tokens)
+        try:
+            return await fn()
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None or attempt >= retries:
+                raise
+            attempt += 1
+            await asyncio.sleep(delay)
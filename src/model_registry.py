@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .batching import token_lengths
+
+
+class SharedEmbedder:
+    """Thread-safe handle to a process-wide embedding model instance.
+
+    ``encode`` and ``token_lengths`` (tokenizer) calls are serialized with a
+    lock so one loaded model can be shared by several engines, threads and
+    Streamlit reruns.
+    """
+
+    def __init__(
+        self, model: Any, model_name: str, device: str | None, backend: str = "torch"
+    ) -> None:
+        self.model = model
+        self.model_name = model_name
+        self.device = device
+        self.backend = backend
+        self._lock = threading.Lock()
+
+    def encode(self, texts: List[str], **kwargs: Any) -> Any:
+        with self._lock:
+            return self.model.encode(texts, **kwargs)
+
+    def token_lengths(self, texts: Sequence[str]) -> np.ndarray:
+        """Token count per text, tokenizing under the same lock as ``encode``."""
+        with self._lock:
+            return token_lengths(self.model, texts)
+
+
+_REGISTRY: Dict[Tuple[str, str | None, str], SharedEmbedder] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_embedder(
+    model_name: str, device: str | None = None, backend: str = "torch"
+) -> SharedEmbedder:
+    """Return the shared embedder for (model_name, device, backend), loading it once.
+
+    ``backend`` is "torch", "onnx" or "torch-int8" (see ``inference_backends``).
+    """
+    key = (model_name, device, backend)
+    embedder = _REGISTRY.get(key)
+    if embedder is not None:
+        return embedder
+    with _REGISTRY_LOCK:
+        embedder = _REGISTRY.get(key)
+        if embedder is None:
+            # Imported lazily: backends pull in torch/transformers/onnxruntime
+            from .inference_backends import load_model
+
+            model = load_model(model_name, device, backend)
+            embedder = SharedEmbedder(model, model_name, device, backend)
+            _REGISTRY[key] = embedder
+    return embedder
+
+
+def clear_registry() -> None:
+    """Drop every shared model (mainly for tests and memory pressure)."""
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from datetime import date
 from pathlib import Path
-from typing import List
+from typing import Any, Iterable, Iterator, List, TextIO, Type, TypeVar
 
 from pydantic import BaseModel, Field
 
@@ -13,6 +13,11 @@ try:
 except Exception:  # pragma: no cover
     ConfigDict = None  # type: ignore
 
+try:
+    from pydantic import TypeAdapter  # type: ignore
+except Exception:  # pragma: no cover
+    TypeAdapter = None  # type: ignore
+
 
 class StrategicObjective(BaseModel):
     """Typed representation of a strategic objective.
@@ -50,23 +55,145 @@ class ActionTask(BaseModel):
         model_config = ConfigDict(extra="allow")
 
 
-def _load_json_array(path: Path) -> list[dict]:
+M = TypeVar("M", bound=BaseModel)
+
+
+def iter_json_records(path: str | Path, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """Stream records from a JSON array file or a JSON Lines file.
+
+    The format is detected from the first non-whitespace character ('[' for an
+    array, '{' for JSON Lines). Only ``chunk_size`` characters plus the record
+    being decoded are held in memory at a time. Empty files and a single
+    multi-line (pretty-printed) top-level object raise ValueError.
+    """
+    path = Path(path)
     with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    if not isinstance(data, list):
-        raise ValueError("Expected a JSON array at '" + str(path) + "'.")
-    return data
+        head = f.read(chunk_size)
+        stripped = head.lstrip()
+        if not stripped:
+            raise ValueError("Empty JSON file at '" + str(path) + "'.")
+        if stripped.startswith("{"):
+            first, newline, _ = stripped.partition("\n")
+            if newline and not _is_json(first):
+                raise ValueError(
+                    "Expected a JSON array or one JSON object per line at '"
+                    + str(path)
+                    + "', found a multi-line top-level object."
+                )
+            yield from _iter_json_lines(head, f, path)
+        elif stripped.startswith("["):
+            yield from _iter_json_array(head, f, chunk_size, path)
+        else:
+            raise ValueError("Expected a JSON array at '" + str(path) + "'.")
+
+
+def _is_json(text: str) -> bool:
+    try:
+        json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    return True
+
+
+def _iter_json_lines(head: str, f: TextIO, path: Path) -> Iterator[dict]:
+    # ``head`` was already read from ``f``; its last line may be incomplete
+    *lines, pending = head.split("\n")
+    for line in lines:
+        rec = _record(line, path)
+        if rec is not None:
+            yield rec
+    for line in f:
+        rec = _record(pending + line, path)
+        pending = ""
+        if rec is not None:
+            yield rec
+    rec = _record(pending, path)
+    if rec is not None:
+        yield rec
+
+
+def _record(line: str, path: Path) -> dict | None:
+    line = line.strip()
+    if not line:
+        return None
+    rec = json.loads(line)
+    if not isinstance(rec, dict):
+        raise ValueError("Expected JSON objects in '" + str(path) + "'.")
+    return rec
+
+
+def _iter_json_array(
+    buf: str, f: TextIO, chunk_size: int, path: Path
+) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    pos = buf.index("[") + 1
+    eof = False
+    while True:
+        # Skip whitespace and separators between records
+        while pos < len(buf) and (buf[pos].isspace() or buf[pos] == ","):
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                rec, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                if not isinstance(rec, dict):
+                    raise ValueError("Expected JSON objects in '" + str(path) + "'.")
+                yield rec
+                pos = end
+                continue
+        if eof:
+            raise ValueError("Unterminated JSON array in '" + str(path) + "'.")
+        # Need more input: drop consumed text and read the next chunk
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def _validate_batches(
+    records: Iterable[dict], model: Type[M], batch_size: int
+) -> Iterator[List[M]]:
+    adapter = TypeAdapter(List[model]) if TypeAdapter is not None else None
+    batch: List[dict] = []
+    for rec in records:
+        batch.append(rec)
+        if len(batch) >= batch_size:
+            yield _validate(batch, model, adapter)
+            batch = []
+    if batch:
+        yield _validate(batch, model, adapter)
+
+
+def _validate(batch: List[dict], model: Type[M], adapter: Any) -> List[M]:
+    if adapter is not None:
+        return adapter.validate_python(batch)
+    return [model(**rec) for rec in batch]  # pragma: no cover
+
+
+def iter_strategy_batches(
+    path: str | Path, batch_size: int = 1000
+) -> Iterator[List[StrategicObjective]]:
+    """Stream strategic objectives in validated batches (JSON array or JSON Lines)."""
+    return _validate_batches(iter_json_records(path), StrategicObjective, batch_size)
+
+
+def iter_action_batches(
+    path: str | Path, batch_size: int = 1000
+) -> Iterator[List[ActionTask]]:
+    """Stream action tasks in validated batches (JSON array or JSON Lines)."""
+    return _validate_batches(iter_json_records(path), ActionTask, batch_size)
 
 
 def load_strategies(path: str | Path) -> List[StrategicObjective]:
-    """Load strategic objectives from a JSON array file."""
-    path = Path(path)
-    records = _load_json_array(path)
-    return [StrategicObjective(**rec) for rec in records]
+    """Load strategic objectives from a JSON array (or JSON Lines) file."""
+    return [s for batch in iter_strategy_batches(path) for s in batch]
 
 
 def load_actions(path: str | Path) -> List[ActionTask]:
-    """Load action tasks from a JSON array file."""
-    path = Path(path)
-    records = _load_json_array(path)
-    return [ActionTask(**rec) for rec in records]
+    """Load action tasks from a JSON array (or JSON Lines) file."""
+    return [a for batch in iter_action_batches(path) for a in batch]
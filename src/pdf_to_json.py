@@ -1,96 +1,189 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import multiprocessing
 import os
 import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional
 
 from pypdf import PdfReader
 
+from .kv_cache import JsonCache
+from .llm_client import call_with_retries, estimate_tokens, get_client
+
 
 OPENAI_MODEL = "gpt-5"
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
+# Documents longer than this (approx. tokens) are extracted window by window
+CHUNK_TOKENS = int(os.environ.get("PDF_CHUNK_TOKENS") or 6000)
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("PDF_CHUNK_OVERLAP_TOKENS") or 300)
 
-def _extract_text(pdf_bytes: bytes) -> str:
-    reader = PdfReader(BytesIO(pdf_bytes))
-    pages = []
-    for p in reader.pages:
-        try:
-            pages.append(p.extract_text() or "")
-        except Exception:
-            pages.append("")
-    return "\n\n".join(pages)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Per-process reader used by the page extraction pool workers
+_WORKER_READER: Optional[PdfReader] = None
 
 
 def _clean_text(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _page_text(reader: PdfReader, index: int) -> str:
+    try:
+        return _clean_text(reader.pages[index].extract_text() or "")
+    except Exception:
+        return ""
+
+
+def _init_page_worker(pdf_bytes: bytes) -> None:
+    global _WORKER_READER
+    _WORKER_READER = PdfReader(BytesIO(pdf_bytes))
+
+
+def _worker_page_text(index: int) -> str:
+    assert _WORKER_READER is not None
+    return _page_text(_WORKER_READER, index)
+
+
+def iter_page_texts(pdf_bytes: bytes, workers: Optional[int] = None) -> Iterator[str]:
+    """Yield cleaned text for each page, in page order.
+
+    With ``workers`` > 1 (default: env PDF_WORKERS or 1) pages are extracted in
+    a "spawn" process pool (forking a process with live torch threads can
+    deadlock); at most two pages per worker are in flight, so memory stays
+    proportional to the worker count rather than the document size.
+    """
+    workers = int(workers or os.environ.get("PDF_WORKERS") or 1)
+    reader = PdfReader(BytesIO(pdf_bytes))
+    n_pages = len(reader.pages)
+    if workers <= 1 or n_pages <= 1:
+        for i in range(n_pages):
+            yield _page_text(reader, i)
+        return
+
+    del reader  # each worker opens its own reader
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_page_worker,
+        initargs=(pdf_bytes,),
+    ) as pool:
+        window: Deque[Future[str]] = deque()
+        next_page = 0
+        while next_page < n_pages or window:
+            while next_page < n_pages and len(window) < 2 * workers:
+                window.append(pool.submit(_worker_page_text, next_page))
+                next_page += 1
+            yield window.popleft().result()
+
+
+def _document_text(pdf_bytes: bytes, workers: Optional[int] = None) -> str:
+    return " ".join(p for p in iter_page_texts(pdf_bytes, workers=workers) if p)
+
+
+# Precompiled patterns for the heuristic parsers
+_STRATEGY_SPLIT = re.compile(r"(?i)\bstrategy\b|\n\s*\d+\.\s")
+_ACTION_SPLIT = re.compile(r"(?i)\baction\b|\n\s*\d+\.\s")
+_TITLE = re.compile(r"(.{10,120}?)([\.!?]|\n)")
+_TITLE_SPAN = 121  # longest possible _TITLE match
+_KPI = re.compile(r"(?i)kpi[s]?:\s*([^\n]+)")
+_KPI_SEP = re.compile(r"[,;]\s+")
+_OWNER = re.compile(r"(?i)owner\s*[:\-]\s*([A-Za-z ]{2,40})")
 
 
-def _simple_heuristic_strategies(text: str) -> List[Dict[str, Any]]:
-    # Very basic extraction: split by headings containing 'Strategy' or numbered sections
-    chunks = re.split(r"(?i)\bstrategy\b|\n\s*\d+\.\s", text)
-    items: List[Dict[str, Any]] = []
+def _iter_sections(pages: Iterable[str], splitter: re.Pattern[str]) -> Iterator[str]:
+    """Split a stream of page texts on ``splitter`` in a single pass.
+
+    Equivalent to ``splitter.split(" ".join(non-empty pages))``: pages are joined
+    with a space, so a separator can never straddle two pages and each page is
+    scanned exactly once.
+    """
+    parts: List[str] = []
+    started = False
+    for page in pages:
+        if not page:
+            continue
+        if started:
+            parts.append(" ")
+        started = True
+        pos = 0
+        for m in splitter.finditer(page):
+            parts.append(page[pos : m.start()])
+            yield "".join(parts)
+            parts = []
+            pos = m.end()
+        parts.append(page[pos:])
+    yield "".join(parts)
+
+
+def _title(ch: str) -> str:
+    # Title: first sentence up to 120 chars
+    m = _TITLE.match(ch, 0, _TITLE_SPAN)
+    return (m.group(1) if m else ch[:80]).strip()
+
+
+def _as_pages(text: str | Iterable[str]) -> Iterable[str]:
+    return [text] if isinstance(text, str) else text
+
+
+def iter_heuristic_strategies(pages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield strategy dicts from a page stream, split on 'Strategy' headings."""
     idx = 1
-    for ch in chunks:
+    for ch in _iter_sections(pages, _STRATEGY_SPLIT):
         ch = ch.strip()
         if len(ch) < 25:
             continue
-        # Title: first sentence up to 120 chars
-        m = re.match(r"(.{10,120}?)([\.!?]|\n)", ch)
-        title = (m.group(1) if m else ch[:80]).strip()
-        # Description: next ~300 chars
-        desc = ch[:400].strip()
         # KPIs: detect lines starting with KPI or bullet keywords
-        kpi_match = re.findall(r"(?i)kpi[s]?:\s*([^\n]+)", ch)
-        kpis = []
-        for km in kpi_match:
+        kpis: List[str] = []
+        for km in _KPI.findall(ch):
             # split by separators
-            kpis.extend([s.strip() for s in re.split(r"[,;]\s+", km) if s.strip()])
-        items.append(
-            {
-                "id": f"S{idx}",
-                "title": title,
-                "description": desc,
-                "kpis": kpis[:5],
-                "priority": None,
-            }
-        )
+            kpis.extend([s.strip() for s in _KPI_SEP.split(km) if s.strip()])
+        yield {
+            "id": f"S{idx}",
+            "title": _title(ch),
+            "description": ch[:400].strip(),
+            "kpis": kpis[:5],
+            "priority": None,
+        }
         idx += 1
-    return items
 
 
-def _simple_heuristic_actions(text: str) -> List[Dict[str, Any]]:
-    chunks = re.split(r"(?i)\baction\b|\n\s*\d+\.\s", text)
-    items: List[Dict[str, Any]] = []
+def iter_heuristic_actions(pages: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield action dicts from a page stream, split on 'Action' headings."""
     idx = 1
-    for ch in chunks:
+    for ch in _iter_sections(pages, _ACTION_SPLIT):
         ch = ch.strip()
         if len(ch) < 25:
             continue
-        m_title = re.match(r"(.{10,120}?)([\.!?]|\n)", ch)
-        title = (m_title.group(1) if m_title else ch[:80]).strip()
-        desc = ch[:300].strip()
         # owner: try to detect Owner: ... pattern
-        owner = None
-        m_owner = re.search(r"(?i)owner\s*[:\-]\s*([A-Za-z ]{2,40})", ch)
-        if m_owner:
-            owner = m_owner.group(1).strip()
-        items.append(
-            {
-                "id": f"A{idx}",
-                "title": title,
-                "description": desc,
-                "owner": owner or "Owner",
-                "start_date": None,
-                "end_date": None,
-                "outputs": [],
-            }
-        )
+        m_owner = _OWNER.search(ch)
+        owner = m_owner.group(1).strip() if m_owner else None
+        yield {
+            "id": f"A{idx}",
+            "title": _title(ch),
+            "description": ch[:300].strip(),
+            "owner": owner or "Owner",
+            "start_date": None,
+            "end_date": None,
+            "outputs": [],
+        }
         idx += 1
-    return items
+
+
+def _simple_heuristic_strategies(text: str | Iterable[str]) -> List[Dict[str, Any]]:
+    return list(iter_heuristic_strategies(_as_pages(text)))
+
+
+def _simple_heuristic_actions(text: str | Iterable[str]) -> List[Dict[str, Any]]:
+    return list(iter_heuristic_actions(_as_pages(text)))
 
 
 def _call_openai_for_json(kind: str, text: str) -> Optional[List[Dict[str, Any]]]:
@@ -98,9 +191,7 @@ def _call_openai_for_json(kind: str, text: str) -> Optional[List[Dict[str, Any]]
     if not OPENAI_API_KEY:
         return None
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = get_client(OPENAI_API_KEY)
         schema = {
             "type": "array",
             "items": {
@@ -136,24 +227,32 @@ def _call_openai_for_json(kind: str, text: str) -> Optional[List[Dict[str, Any]]
 
         system_prompt = "You extract structured JSON arrays. Output ONLY valid JSON."
         user_prompt = (
-            f"Convert the following PDF text into a JSON array of {kind} entries. "
+            f"Convert the following PDF text into a JSON array of {kind} entries, "
+            'returned as {"items": [...]}. '
             "Use concise 'id' like S1/S2 or A1/A2. Include key fields.\n\n" + text
         )
 
-        chat = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0,
-            response_format={"type": "json_object"},
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+        chat = call_with_retries(
+            lambda: client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                temperature=0,
+                response_format={"type": "json_object"},
+            ),
+            estimate_tokens(messages, completion_tokens=4000),
         )
         raw = chat.choices[0].message.content
         if raw is None:
             return None
 
         data = json.loads(raw)
+        # json_object mode returns an object; accept the array wrapped in any key
+        if isinstance(data, dict):
+            data = next((v for v in data.values() if isinstance(v, list)), None)
         # Basic validation
         if isinstance(data, list) and data and isinstance(data[0], dict):
             return data
@@ -162,17 +261,209 @@ def _call_openai_for_json(kind: str, text: str) -> Optional[List[Dict[str, Any]]
         return None
 
 
-def parse_strategic_pdf(pdf_bytes: bytes) -> List[Dict[str, Any]]:
-    text = _clean_text(_extract_text(pdf_bytes))
-    data = _call_openai_for_json("strategic", text)
-    if data:
-        return data
-    return _simple_heuristic_strategies(text)
+def _split_windows(text: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """Split text into overlapping windows of roughly ``max_tokens`` tokens.
+
+    Tokens are approximated as 4 characters; cuts fall on whitespace.
+    """
+    max_chars = max(1, max_tokens) * 4
+    overlap_chars = max(0, min(overlap_tokens, max_tokens // 2)) * 4
+    if len(text) <= max_chars:
+        return [text] if text else []
+    windows: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(len(text), start + max_chars)
+        if end < len(text):
+            cut = text.rfind(" ", start + max_chars // 2, end)
+            end = cut if cut != -1 else end
+        windows.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        nxt = end - overlap_chars
+        if overlap_chars:
+            space = text.find(" ", nxt, end)
+            nxt = space + 1 if space != -1 else nxt
+        start = max(nxt, start + 1)
+    return [w for w in windows if w]
+
+
+# Leading description characters two overlap duplicates must share
+_DEDUPE_PREFIX_CHARS = 40
+
+
+def _normalized(text: Any) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", str(text or "")).casefold().split())
+
+
+def _dedupe_key(entry: Dict[str, Any]) -> str:
+    return _normalized(entry.get("title") or entry.get("description"))
+
+
+def _same_entry(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    """Same description start (an entry cut at a window edge is a prefix)."""
+    head_a = _normalized(a.get("description"))[:_DEDUPE_PREFIX_CHARS]
+    head_b = _normalized(b.get("description"))[:_DEDUPE_PREFIX_CHARS]
+    n = min(len(head_a), len(head_b))
+    return head_a[:n] == head_b[:n]
+
+
+def _merge_entries(kind: str, batches: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Merge per-window entries in document order and renumber ids S1.. / A1..
+
+    ``batches`` holds one list per window, in window order. An entry is a
+    duplicate only when the previous window produced one with the same
+    normalized title and description start, which is what the window
+    overlap yields; the longest description wins. Distinct entries sharing
+    a title (e.g. "Reduce costs" under two pillars) are kept.
+    """
+    out: List[Dict[str, Any]] = []
+    previous: Dict[str, List[Dict[str, Any]]] = {}
+    for batch in batches:
+        current: Dict[str, List[Dict[str, Any]]] = {}
+        for entry in batch:
+            if not isinstance(entry, dict):
+                continue
+            key = _dedupe_key(entry)
+            if not key:
+                continue
+            seen = next(
+                (e for e in previous.get(key, []) if _same_entry(e, entry)), None
+            )
+            if seen is None:
+                seen = dict(entry)
+                out.append(seen)
+            elif len(str(entry.get("description") or "")) > len(
+                str(seen.get("description") or "")
+            ):
+                seen.update(entry)
+            current.setdefault(key, []).append(seen)
+        previous = current
+    prefix = "S" if kind == "strategic" else "A"
+    for i, entry in enumerate(out, start=1):
+        entry["id"] = f"{prefix}{i}"
+    return out
+
+
+def _call_openai_chunked(kind: str, text: str) -> Optional[List[Dict[str, Any]]]:
+    """Map-reduce extraction: windows are sent concurrently, then merged."""
+    windows = _split_windows(text, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS)
+    if len(windows) <= 1:
+        return _call_openai_for_json(kind, text)
+    workers = min(len(windows), int(os.environ.get("PDF_LLM_CONCURRENCY") or 4))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda w: _call_openai_for_json(kind, w), windows))
+    # Failed windows stay as empty batches so only true neighbours are deduped
+    batches = [r or [] for r in results]
+    if not any(batches):
+        return None
+    return _merge_entries(kind, batches) or None
+
+
+def _extraction_mode() -> str:
+    return (os.environ.get("PDF_EXTRACTION_MODE") or "auto").lower()
+
+
+def _llm_enabled() -> bool:
+    return bool(OPENAI_API_KEY) and _extraction_mode() != "heuristic"
+
+
+def _extract_with_llm(kind: str, text: str) -> Optional[List[Dict[str, Any]]]:
+    mode = _extraction_mode()
+    if not _llm_enabled():
+        return None
+    if mode == "chunked" or (
+        mode == "auto" and len(text) > CHUNK_TOKENS * 4
+    ):
+        return _call_openai_chunked(kind, text)
+    return _call_openai_for_json(kind, text)
+
+
+_PDF_CACHE: Optional[JsonCache] = None
+
+
+def get_pdf_cache() -> Optional[JsonCache]:
+    """Shared conversion cache (env PDF_CACHE_DIR, default "pdf_cache"; empty disables)."""
+    global _PDF_CACHE
+    directory = os.environ.get("PDF_CACHE_DIR", "pdf_cache")
+    if not directory:
+        return None
+    if _PDF_CACHE is None or _PDF_CACHE.path.parent != Path(directory):
+        _PDF_CACHE = JsonCache(
+            Path(directory) / "conversions.sqlite3",
+            max_entries=int(os.environ.get("PDF_CACHE_MAX_ENTRIES") or 500),
+        )
+    return _PDF_CACHE
+
+
+# Bump when extraction or merging changes what a conversion returns
+_PDF_CACHE_VERSION = 2
+
+
+def _pdf_cache_key(pdf_bytes: bytes, kind: str) -> str:
+    """Cache key: PDF digest first (for invalidation), then every output-shaping setting."""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    prefix = f"{digest}:{kind}:v{_PDF_CACHE_VERSION}"
+    if _llm_enabled():
+        return (
+            f"{prefix}:llm-{_extraction_mode()}:{OPENAI_MODEL}"
+            f":chunks-{CHUNK_TOKENS}-{CHUNK_OVERLAP_TOKENS}"
+        )
+    return f"{prefix}:heuristic"
+
+
+def invalidate_pdf_cache(pdf_bytes: Optional[bytes] = None) -> int:
+    """Drop cached conversions for one PDF (all kinds/modes), or all of them."""
+    cache = get_pdf_cache()
+    if cache is None:
+        return 0
+    if pdf_bytes is None:
+        count = len(cache)
+        cache.clear()
+        return count
+    return cache.invalidate_prefix(hashlib.sha256(pdf_bytes).hexdigest() + ":")
+
+
+def _parse_pdf(
+    kind: str, pdf_bytes: bytes, workers: Optional[int], use_cache: bool
+) -> List[Dict[str, Any]]:
+    cache = get_pdf_cache() if use_cache else None
+    key = _pdf_cache_key(pdf_bytes, kind)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    iter_items = iter_heuristic_strategies if kind == "strategic" else iter_heuristic_actions
+    if not _llm_enabled():
+        # Heuristics parse the page stream directly, never holding the full text
+        data = list(iter_items(iter_page_texts(pdf_bytes, workers)))
+    else:
+        text = _document_text(pdf_bytes, workers=workers)
+        data = _extract_with_llm(kind, text)
+        if not data:
+            # Do not cache a fallback under the LLM key; the next run retries
+            return list(iter_items([text]))
+    if cache is not None:
+        cache.set(key, data)
+    return data
+
+
+def parse_strategic_pdf(
+    pdf_bytes: bytes, workers: Optional[int] = None, use_cache: bool = True
+) -> List[Dict[str, Any]]:
+    """Convert a strategic plan PDF into a JSON array of strategy entries.
+
+    Results are cached by SHA-256 of the PDF bytes, parser mode and model.
+    """
+    return _parse_pdf("strategic", pdf_bytes, workers, use_cache)
+
 
+def parse_action_pdf(
+    pdf_bytes: bytes, workers: Optional[int] = None, use_cache: bool = True
+) -> List[Dict[str, Any]]:
+    """Convert an action plan PDF into a JSON array of action entries.
 
-def parse_action_pdf(pdf_bytes: bytes) -> List[Dict[str, Any]]:
-    text = _clean_text(_extract_text(pdf_bytes))
-    data = _call_openai_for_json("action", text)
-    if data:
-        return data
-    return _simple_heuristic_actions(text)
+    Results are cached by SHA-256 of the PDF bytes, parser mode and model.
+    """
+    return _parse_pdf("action", pdf_bytes, workers, use_cache)
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+
+
+def check_precision(precision: str) -> str:
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"Unknown embedding precision: {precision!r}; expected one of {PRECISIONS}"
+        )
+    return precision
+
+
+def quantize(mat: Any, precision: str) -> Tuple[np.ndarray, np.ndarray | None]:
+    """Encode float rows as ``precision``; int8 also returns per-row scales.
+
+    int8 is symmetric scalar quantization: ``row ≈ codes * scale`` with
+    ``scale = max|row| / 127``.
+    """
+    arr = np.asarray(mat, dtype=np.float32)
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1)
+    if check_precision(precision) == "float32":
+        return np.ascontiguousarray(arr), None
+    if precision == "float16":
+        return arr.astype(np.float16), None
+    scales = np.abs(arr).max(axis=1) / 127.0 if arr.size else np.zeros(len(arr))
+    scales = scales.astype(np.float32)
+    safe = np.where(scales == 0.0, 1.0, scales)
+    codes = np.clip(np.rint(arr / safe[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def dequantize(data: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """Inverse of ``quantize`` (float32 output)."""
+    out = data.astype(np.float32)
+    if scales is not None:
+        out *= scales[:, None]
+    return out
+
+
+class QuantizedMatrix:
+    """Row matrix of embeddings held at float32, float16 or int8 precision.
+
+    Scoring converts one chunk of rows at a time back to float32, so the
+    full-precision matrix is never materialized. Rows live in a buffer that
+    grows by doubling, so streaming appends cost amortized O(rows added).
+    """
+
+    # Rows dequantized per chunk while scoring
+    chunk_rows = 65_536
+
+    def __init__(self, precision: str = "float32", dim: int = 0) -> None:
+        self.precision = check_precision(precision)
+        dtype = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+        self._rows = 0
+        self._data = np.zeros((0, dim), dtype=dtype[precision])
+        self._scales: np.ndarray | None = (
+            np.zeros(0, dtype=np.float32) if precision == "int8" else None
+        )
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def data(self) -> np.ndarray:
+        """Stored rows (a view; spare capacity excluded)."""
+        return self._data[: self._rows]
+
+    @property
+    def scales(self) -> np.ndarray | None:
+        return None if self._scales is None else self._scales[: self._rows]
+
+    @property
+    def nbytes(self) -> int:
+        scales = self.scales.nbytes if self.scales is not None else 0
+        return int(self.data.nbytes + scales)
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        capacity = self._data.shape[0]
+        if rows <= capacity and self._data.shape[1] == dim:
+            return
+        grown = max(rows, capacity * 2, 16)
+        data = np.empty((grown, dim), dtype=self._data.dtype)
+        scales = np.empty(grown, dtype=np.float32)
+        if self._rows:
+            data[: self._rows] = self.data
+            if self._scales is not None:
+                scales[: self._rows] = self.scales
+        self._data = data
+        if self._scales is not None:
+            self._scales = scales
+
+    def append(self, vecs: np.ndarray) -> None:
+        data, scales = quantize(vecs, self.precision)
+        stop = self._rows + len(data)
+        self._reserve(stop, data.shape[1])
+        self._data[self._rows : stop] = data
+        if self._scales is not None and scales is not None:
+            self._scales[self._rows : stop] = scales
+        self._rows = stop
+
+    def assign(self, pos: int, vec: np.ndarray) -> None:
+        data, scales = quantize(vec, self.precision)
+        self.data[pos] = data[0]
+        if self._scales is not None and scales is not None:
+            self._scales[pos] = scales[0]
+
+    def take(self, rows: Sequence[int]) -> None:
+        """Keep only ``rows``, in that order."""
+        rows = list(rows)
+        self._data = self.data[rows]
+        if self._scales is not None:
+            self._scales = self.scales[rows]
+        self._rows = len(rows)
+
+    def to_float32(self) -> np.ndarray:
+        return dequantize(self.data, self.scales)
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """``queries @ rows.T`` computed chunk by chunk on the stored codes."""
+        if self.precision == "float32":
+            return queries @ self.data.T
+        out = np.empty((queries.shape[0], len(self)), dtype=np.float32)
+        for start in range(0, len(self), self.chunk_rows):
+            stop = start + self.chunk_rows
+            block = self.data[start:stop].astype(np.float32)
+            out[:, start:stop] = queries @ block.T
+            if self.scales is not None:
+                out[:, start:stop] *= self.scales[start:stop]
+        return out
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-top, axis=1, kind="stable")
+    return np.take_along_axis(idx, order, axis=1)
+
+
+def recall_report(
+    embeddings: Any,
+    queries: Any,
+    top_k: int = 10,
+    precisions: Sequence[str] = ("float16", "int8"),
+) -> Dict[str, Any]:
+    """Top-k recall and score drift of each precision against float32.
+
+    - ``recall_at_k``: mean fraction of the exact float32 top-k ids retrieved
+    - ``mean_abs_drift`` / ``max_abs_drift``: error of the quantized scores
+      on the exact top-k pairs
+    - ``bytes`` / ``compression``: matrix footprint and ratio vs float32
+    """
+
+    def _normalized(arr: Any) -> np.ndarray:
+        mat = np.asarray(arr, dtype=np.float32)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return mat / norms
+
+    base = _normalized(embeddings)
+    q = _normalized(queries)
+    k = max(1, min(int(top_k), base.shape[0]))
+    exact_scores = q @ base.T
+    exact = _top_k(exact_scores, k)
+    exact_top = np.take_along_axis(exact_scores, exact, axis=1)
+
+    report: Dict[str, Any] = {
+        "actions": int(base.shape[0]),
+        "queries": int(q.shape[0]),
+        "top_k": k,
+        "float32_bytes": int(base.nbytes),
+        "precisions": {},
+    }
+    for precision in precisions:
+        matrix = QuantizedMatrix(precision)
+        matrix.append(base)
+        scores = matrix.scores(q)
+        found = _top_k(scores, k)
+        recall: List[float] = [
+            len(set(a.tolist()) & set(b.tolist())) / k for a, b in zip(exact, found)
+        ]
+        drift = np.abs(np.take_along_axis(scores, exact, axis=1) - exact_top)
+        report["precisions"][precision] = {
+            "recall_at_k": round(float(np.mean(recall)), 6),
+            "mean_abs_drift": round(float(drift.mean()), 6),
+            "max_abs_drift": round(float(drift.max()), 6),
+            "bytes": matrix.nbytes,
+            "compression": round(base.nbytes / max(1, matrix.nbytes), 2),
+        }
+    return report
@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import os
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
 
+from .kv_cache import JsonCache
+from .llm_client import acall_with_retries, call_with_retries, estimate_tokens, get_client
 from .models import StrategicObjective
 
 if TYPE_CHECKING:
     from openai.types.chat import ChatCompletionUserMessageParam
 
 
+_SYSTEM_PROMPT = "You are an AI business analyst."
+
+
 def _alignment_label(score: float) -> str:
     if score >= 0.75:
         return "Strong"
@@ -28,11 +35,35 @@ class RAGEngine:
     - Fallback to deterministic, rule-based suggestions if LLM is unavailable
     """
 
-    def __init__(self, model: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        cache_directory: Optional[str] = "rag_cache",
+        cache_ttl_seconds: Optional[float] = 7 * 24 * 3600,
+        cache_max_entries: int = 10_000,
+    ) -> None:
         # Model name can be overridden via env var OPENAI_MODEL
         # Use a widely supported default; allow override via env or arg
         self.model = model or os.environ.get("OPENAI_MODEL") or "gpt-4o-mini"
         self.api_key = os.environ.get("OPENAI_API_KEY")
+        # Any OpenAI-compatible endpoint (e.g. a local server) via OPENAI_BASE_URL
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL") or None
+        # Upper bound on in-flight requests for generate_many
+        self.max_concurrency = max(
+            1, int(max_concurrency or os.environ.get("RAG_MAX_CONCURRENCY") or 8)
+        )
+        # Parsed LLM responses keyed by (model, prompt hash); None disables caching
+        self.cache = (
+            JsonCache(
+                os.path.join(cache_directory, "responses.sqlite3"),
+                max_entries=cache_max_entries,
+                ttl_seconds=cache_ttl_seconds,
+            )
+            if cache_directory
+            else None
+        )
 
     # ------------------------- Prompt Construction -------------------------
     def build_prompt(
@@ -41,7 +72,7 @@ class RAGEngine:
         current_score: float,
         retrieved_actions: List[Dict[str, Any]],
     ) -> ChatCompletionUserMessageParam:
-        system = "You are an AI business analyst."
+        system = _SYSTEM_PROMPT
 
         actions_lines = []
         for i, a in enumerate(retrieved_actions, start=1):
@@ -91,24 +122,47 @@ class RAGEngine:
             "content": content,
         }
 
+    # ------------------------- Response Cache -------------------------
+    def _cache_key(self, user_msg: ChatCompletionUserMessageParam) -> str:
+        digest = hashlib.sha256(
+            json.dumps([_SYSTEM_PROMPT, user_msg["content"]]).encode("utf-8")
+        ).hexdigest()
+        return f"{self.model}:{digest}"
+
+    def _cached(self, user_msg: ChatCompletionUserMessageParam) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(user_msg))
+
+    def _store(
+        self, user_msg: ChatCompletionUserMessageParam, parsed: Dict[str, Any]
+    ) -> None:
+        if self.cache is not None:
+            self.cache.set(self._cache_key(user_msg), parsed)
+
     # ------------------------- LLM Invocation -------------------------
+    def _messages(self, user_msg: ChatCompletionUserMessageParam) -> List[Any]:
+        return [
+            {
+                "role": "system",
+                "content": _SYSTEM_PROMPT,
+            },
+            user_msg,
+        ]
+
     def _call_openai(self, user_msg: ChatCompletionUserMessageParam) -> Optional[str]:
         if not self.api_key:
             print("RAGEngine: OPENAI_API_KEY not set; using fallback.")
             return None
         try:
-            from openai import OpenAI  # type: ignore
-
-            client = OpenAI(api_key=self.api_key)
-            completion = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an AI business analyst.",
-                    },
-                    user_msg,
-                ],
+            # Shared pooled client; rate limits and 429/5xx retries handled centrally
+            client = get_client(self.api_key, self.base_url)
+            messages = self._messages(user_msg)
+            completion = call_with_retries(
+                lambda: client.chat.completions.create(
+                    model=self.model, messages=messages
+                ),
+                estimate_tokens(messages),
             )
             print(f"RAGEngine: OpenAI call succeeded (model={self.model}).")
             return completion.choices[0].message.content
@@ -116,6 +170,22 @@ class RAGEngine:
             print(f"RAGEngine: OpenAI call failed: {e!r}; using fallback.")
             return None
 
+    async def _acall_openai(
+        self, client: Any, user_msg: ChatCompletionUserMessageParam
+    ) -> Optional[str]:
+        try:
+            messages = self._messages(user_msg)
+            completion = await acall_with_retries(
+                lambda: client.chat.completions.create(
+                    model=self.model, messages=messages
+                ),
+                estimate_tokens(messages),
+            )
+            return completion.choices[0].message.content
+        except Exception as e:
+            print(f"RAGEngine: OpenAI call failed: {e!r}; using fallback.")
+            return None
+
     # ------------------------- Parsing and Fallback -------------------------
     def _parse_json(self, text: Optional[str]) -> Optional[Dict[str, Any]]:
         if not text:
@@ -228,8 +298,68 @@ class RAGEngine:
         retrieved_actions: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
         user_msg = self.build_prompt(strategy, current_score, retrieved_actions)
+        cached = self._cached(user_msg)
+        if cached:
+            return cached
         text = self._call_openai(user_msg)
         parsed = self._parse_json(text)
         if parsed:
+            self._store(user_msg, parsed)
             return parsed
         return self._fallback_rule_based(strategy, current_score, retrieved_actions)
+
+    async def generate_many(
+        self,
+        requests: Sequence[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Generate suggestions for many strategies concurrently.
+
+        Each request is a dict with the ``generate`` arguments: strategy,
+        current_score, retrieved_actions. At most ``max_concurrency`` LLM calls
+        are in flight at once; results keep the input order and every item
+        that fails falls back to the rule-based suggestions on its own.
+        """
+        if not requests:
+            return []
+        user_msgs = [
+            self.build_prompt(
+                r["strategy"], r["current_score"], r["retrieved_actions"]
+            )
+            for r in requests
+        ]
+        results: List[Optional[Dict[str, Any]]] = [self._cached(m) for m in user_msgs]
+        pending = [i for i, res in enumerate(results) if not res]
+        if pending and not self.api_key:
+            print("RAGEngine: OPENAI_API_KEY not set; using fallback.")
+            for i in pending:
+                results[i] = self._fallback_rule_based(**requests[i])
+            pending = []
+        if not pending:
+            return results  # type: ignore[return-value]
+
+        from openai import AsyncOpenAI  # type: ignore
+
+        limit = asyncio.Semaphore(max(1, max_concurrency or self.max_concurrency))
+        # One pooled async client per batch (async pools are bound to the event loop)
+        client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+
+        async def _one(i: int) -> None:
+            async with limit:
+                text = await self._acall_openai(client, user_msgs[i])
+            parsed = self._parse_json(text)
+            if parsed:
+                self._store(user_msgs[i], parsed)
+                results[i] = parsed
+            else:
+                results[i] = self._fallback_rule_based(**requests[i])
+
+        try:
+            await asyncio.gather(*(_one(i) for i in pending))
+        finally:
+            await client.close()
+        print(
+            f"RAGEngine: {len(pending)} LLM calls, "
+            f"{len(requests) - len(pending)} cache hits (model={self.model})."
+        )
+        return results  # type: ignore[return-value]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+@dataclass
+class SparseSimilarity:
+    """Thresholded strategy × action cosine similarities in COO form.
+
+    Only pairs with similarity >= ``floor`` are kept. Entries are sorted by
+    (row, col), so ``indptr`` gives a CSR view without copying the data.
+    Rows index ``strategy_ids`` and columns index ``action_ids``.
+    """
+
+    strategy_ids: List[str]
+    action_ids: List[str]
+    rows: np.ndarray
+    cols: np.ndarray
+    values: np.ndarray
+    floor: float
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return (len(self.strategy_ids), len(self.action_ids))
+
+    @property
+    def nnz(self) -> int:
+        return int(self.values.shape[0])
+
+    def indptr(self) -> np.ndarray:
+        """CSR row pointer: entries of row i live in [indptr[i], indptr[i + 1])."""
+        counts = np.bincount(self.rows, minlength=self.shape[0])
+        return np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    def to_scipy(self) -> Any:
+        """Return a ``scipy.sparse.csr_matrix`` (requires scipy)."""
+        from scipy.sparse import csr_matrix
+
+        return csr_matrix(
+            (self.values, self.cols, self.indptr()), shape=self.shape
+        )
+
+    # ------------------------- Derived metrics -------------------------
+    def strategy_max(self) -> np.ndarray:
+        """Best similarity per strategy (0.0 when nothing reaches the floor)."""
+        out = np.zeros(self.shape[0], dtype=np.float32)
+        np.maximum.at(out, self.rows, self.values)
+        return out
+
+    def action_max(self) -> np.ndarray:
+        """Best similarity per action (0.0 when nothing reaches the floor)."""
+        out = np.zeros(self.shape[1], dtype=np.float32)
+        np.maximum.at(out, self.cols, self.values)
+        return out
+
+    def strategy_breadth(self, threshold: float) -> Dict[str, int]:
+        """Number of actions at or above ``threshold`` for each strategy."""
+        mask = self.values >= threshold
+        counts = np.bincount(self.rows[mask], minlength=self.shape[0])
+        return {sid: int(c) for sid, c in zip(self.strategy_ids, counts)}
+
+    def orphan_actions(self, threshold: float) -> List[str]:
+        """Actions whose best similarity to any strategy is below ``threshold``."""
+        best = self.action_max()
+        return [aid for aid, b in zip(self.action_ids, best) if b < threshold]
+
+    def top_k(self, k: int) -> List[List[tuple[str, float]]]:
+        """Top-k (action id, similarity) per strategy, highest first."""
+        ptr = self.indptr()
+        out: List[List[tuple[str, float]]] = []
+        for i in range(self.shape[0]):
+            vals = self.values[ptr[i] : ptr[i + 1]]
+            cols = self.cols[ptr[i] : ptr[i + 1]]
+            order = np.argsort(-vals, kind="stable")[:k]
+            out.append([(self.action_ids[cols[j]], float(vals[j])) for j in order])
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly CSR representation."""
+        return {
+            "shape": list(self.shape),
+            "floor": self.floor,
+            "strategy_ids": list(self.strategy_ids),
+            "action_ids": list(self.action_ids),
+            "indptr": self.indptr().tolist(),
+            "indices": self.cols.tolist(),
+            "values": [round(float(v), 6) for v in self.values],
+        }
+
+
+def compute_sparse_similarity(
+    strategy_embeddings: Any,
+    action_embeddings: Any,
+    strategy_ids: Sequence[str],
+    action_ids: Sequence[str],
+    floor: float = 0.3,
+    block_size: int = 2048,
+) -> SparseSimilarity:
+    """Blockwise cosine similarity keeping only pairs >= ``floor``.
+
+    Peak working memory is one ``block_size`` × ``block_size`` float32 block
+    plus the kept entries.
+    """
+
+    def _normalized(arr: Any) -> np.ndarray:
+        mat = np.asarray(arr, dtype=np.float32)
+        if mat.size == 0:
+            # Empty inputs may arrive as (0,) or (0, 0); keep them 2-D
+            return mat.reshape(len(mat), mat.shape[-1] if mat.ndim == 2 else 0)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return mat / norms
+
+    s_mat = _normalized(strategy_embeddings)
+    a_mat = _normalized(action_embeddings)
+    block = max(1, int(block_size))
+    if not s_mat.shape[0] or not a_mat.shape[0]:
+        # Nothing to compare; widths may differ (e.g. (0, 0) from an empty encode)
+        s_mat = a_mat = np.zeros((0, 0), dtype=np.float32)
+
+    rows_parts: List[np.ndarray] = []
+    cols_parts: List[np.ndarray] = []
+    vals_parts: List[np.ndarray] = []
+    for r0 in range(0, s_mat.shape[0], block):
+        s_block = s_mat[r0 : r0 + block]
+        for c0 in range(0, a_mat.shape[0], block):
+            scores = s_block @ a_mat[c0 : c0 + block].T
+            r, c = np.nonzero(scores >= floor)
+            if r.size:
+                rows_parts.append((r + r0).astype(np.int32))
+                cols_parts.append((c + c0).astype(np.int32))
+                vals_parts.append(scores[r, c].astype(np.float32))
+
+    if rows_parts:
+        rows = np.concatenate(rows_parts)
+        cols = np.concatenate(cols_parts)
+        vals = np.concatenate(vals_parts)
+        order = np.lexsort((cols, rows))
+        rows, cols, vals = rows[order], cols[order], vals[order]
+    else:
+        rows = np.zeros(0, dtype=np.int32)
+        cols = np.zeros(0, dtype=np.int32)
+        vals = np.zeros(0, dtype=np.float32)
+
+    return SparseSimilarity(
+        strategy_ids=list(strategy_ids),
+        action_ids=list(action_ids),
+        rows=rows,
+        cols=cols,
+        values=np.clip(vals, 0.0, 1.0),
+        floor=float(floor),
+    )
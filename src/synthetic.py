@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+import zlib
+from datetime import date, timedelta
+from typing import List, Sequence
+
+import numpy as np
+
+from .models import ActionTask, StrategicObjective
+
+_VOCABULARY = (
+    "reduce landed cost supplier lanes improve clearance time automate reporting "
+    "variance dashboard freight duties insurance compliance customer retention "
+    "digital onboarding warehouse capacity forecast accuracy inventory turnover "
+    "service level carbon emissions training workforce safety audit governance "
+    "pricing margin revenue growth partner network quality defects cycle time "
+    "data platform analytics integration security resilience procurement"
+).split()
+
+_OWNERS = ["Finance Ops", "Operations", "Data Science", "Procurement", "IT", "HR"]
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(max(1, words)))
+
+
+def synthetic_strategies(
+    n: int, words: int = 40, seed: int = 0
+) -> List[StrategicObjective]:
+    """Deterministic strategic objectives with ~``words`` words of description."""
+    rng = random.Random(seed)
+    return [
+        StrategicObjective(
+            id=f"S{i + 1}",
+            title=_sentence(rng, 5).capitalize(),
+            description=_sentence(rng, words),
+            kpis=[f"{_sentence(rng, 3)} < {rng.randint(1, 20)}%" for _ in range(2)],
+        )
+        for i in range(n)
+    ]
+
+
+def synthetic_actions(
+    n: int, words: int = 30, seed: int = 1, length_spread: float = 0.0
+) -> List[ActionTask]:
+    """Deterministic action tasks with ~``words`` words of description.
+
+    ``length_spread`` in [0, 1) varies each description's length uniformly
+    within ``words * (1 ± length_spread)``, like real plans mixing one-liners
+    and long descriptions.
+    """
+    rng = random.Random(seed)
+    low = max(1, round(words * (1 - length_spread)))
+    high = max(low, round(words * (1 + length_spread)))
+    start = date(2026, 1, 1)
+    actions: List[ActionTask] = []
+    for i in range(n):
+        begin = start + timedelta(days=rng.randint(0, 180))
+        actions.append(
+            ActionTask(
+                id=f"A{i + 1}",
+                title=_sentence(rng, 4).capitalize(),
+                description=_sentence(
+                    rng, words if low == high else rng.randint(low, high)
+                ),
+                owner=rng.choice(_OWNERS),
+                start_date=begin,
+                end_date=begin + timedelta(days=rng.randint(30, 240)),
+                outputs=[_sentence(rng, 3)],
+            )
+        )
+    return actions
+
+
+class HashEmbedder:
+    """Model-free embedder for benchmarks and tests (feature hashing of tokens).
+
+    Deterministic across processes, needs no model download, and keeps the
+    ``encode(texts, normalize_embeddings=...)`` shape of SentenceTransformer.
+    Texts sharing words get positive cosine similarity.
+    """
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = int(dim)
+
+    def encode(
+        self, texts: Sequence[str], normalize_embeddings: bool = True, **kwargs
+    ) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for token in text.lower().split():
+                h = zlib.crc32(token.encode("utf-8"))
+                out[i, h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            norms[norms == 0.0] = 1.0
+            out /= norms
+        return out
+
+
+def load_hash_embedder(model_name: str, device: str | None = None) -> HashEmbedder:
+    """Model factory for ``EncoderPool`` that skips loading a real model."""
+    return HashEmbedder()
@@ -1,24 +1,73 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Mapping, Sequence, Union
+from typing import Any, Dict, List, Mapping, Protocol, Sequence, Union, TYPE_CHECKING
 import os
 import logging
 
-import chromadb
-from chromadb.config import Settings
-from chromadb.api.types import IncludeEnum, Metadata
 import numpy as np
 
+from .quantization import QuantizedMatrix
+
+if TYPE_CHECKING:
+    from chromadb.api.types import Metadata
+
+    from .action_table import ActionTable
+
+
+def _sanitize_value(v: Any) -> Union[str, int, float, bool]:
+    if v is None:
+        return ""
+    if isinstance(v, (str, int, float, bool)):
+        return v
+    return str(v)
+
+
+def _sanitize_metadata(md: Mapping[str, Any]) -> Dict[str, Union[str, int, float, bool]]:
+    """Coerce metadata values to primitives (str/int/float/bool); None → ""."""
+    return {k: _sanitize_value(v) for k, v in md.items()}
+
+
+class VectorBackend(Protocol):
+    """Interface shared by the action vector stores used by AlignmentEngine.
+
+    Query results are lists of dicts: {id, similarity, metadata, document}.
+    """
+
+    def upsert_actions(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        embeddings: Any,
+        metadatas: Sequence[Mapping[str, Union[str, int, float, bool]]],
+    ) -> None: ...
+
+    def upsert_table(self, table: ActionTable) -> None: ...
+
+    def query_by_embedding(
+        self, embedding: List[float], top_k: int = 5
+    ) -> List[Dict[str, Any]]: ...
+
+    def query_by_embeddings(
+        self, embeddings: Any, top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]: ...
+
+    def get_content_hashes(self) -> Dict[str, str]: ...
+
+    def delete_actions(self, ids: Sequence[str]) -> None: ...
+
 
 class ActionVectorStore:
     """Persistent ChromaDB store for action embeddings.
 
-    - Collection name: "actions"
+    - Collection name: "actions" by default; pass another name to keep
+      separate indexes (e.g. one per UI session) in the same directory
     - Persistent directory: "chroma_db/"
     - Uses cosine distance and converts to similarity (1 - distance)
     """
 
-    def __init__(self, persist_directory: str = "chroma_db") -> None:
+    def __init__(
+        self, persist_directory: str = "chroma_db", collection_name: str = "actions"
+    ) -> None:
         # Hard-disable ChromaDB telemetry to avoid PostHog capture errors
         os.environ.setdefault("CHROMADB_ANONYMIZED_TELEMETRY", "false")
         os.environ.setdefault("ANONYMIZED_TELEMETRY", "false")
@@ -42,6 +91,10 @@ class ActionVectorStore:
         logging.getLogger("chromadb").setLevel(logging.ERROR)
         logging.getLogger("chromadb.telemetry").setLevel(logging.ERROR)
 
+        # Imported lazily so that importing this module stays cheap
+        import chromadb
+        from chromadb.config import Settings
+
         # Disable telemetry via client settings too
         self.client = chromadb.PersistentClient(
             path=persist_directory,
@@ -49,7 +102,7 @@ class ActionVectorStore:
         )
         # Ensure cosine space for distances
         self.collection = self.client.get_or_create_collection(
-            name="actions",
+            name=collection_name,
             metadata={"hnsw:space": "cosine"},
         )
 
@@ -61,37 +114,70 @@ class ActionVectorStore:
         metadatas: Sequence[Mapping[str, Union[str, int, float, bool]]],
     ) -> None:
         """Upsert action documents with embeddings and metadata."""
-        # Convert to float32 numpy array to satisfy Chroma's expected types
+        # Chroma accepts a 2-D float32 array as-is (no-op for engine output)
         embeddings_np = np.asarray(embeddings, dtype=np.float32)
 
-        # Sanitize metadata values to primitives (str/int/float/bool)
-        def _sanitize(md: Mapping[str, Any]) -> Dict[str, Union[str, int, float, bool]]:
-            out: Dict[str, Union[str, int, float, bool]] = {}
-            for k, v in md.items():
-                if v is None:
-                    out[k] = ""
-                elif isinstance(v, (str, int, float, bool)):
-                    out[k] = v
-                else:
-                    out[k] = str(v)
-            return out
-
-        metadatas_sanitized: List[Metadata] = [_sanitize(m) for m in list(metadatas)]
+        metadatas_sanitized: List[Metadata] = [
+            _sanitize_metadata(m) for m in list(metadatas)
+        ]
+        ids = list(ids)
+        documents = list(documents)
         # Chroma 0.5+ supports upsert; fall back to add if needed.
-        if hasattr(self.collection, "upsert"):
-            self.collection.upsert(
-                ids=list(ids),
-                documents=list(documents),
-                embeddings=embeddings_np,
-                metadatas=metadatas_sanitized,
+        write = getattr(self.collection, "upsert", None) or self.collection.add
+        # Chroma rejects writes larger than its max batch size
+        step = self._batch_size()
+        for i in range(0, len(ids), step):
+            write(
+                ids=ids[i : i + step],
+                documents=documents[i : i + step],
+                embeddings=embeddings_np[i : i + step],
+                metadatas=metadatas_sanitized[i : i + step],
             )
-        else:  # pragma: no cover
-            self.collection.add(
-                ids=list(ids),
-                documents=list(documents),
-                embeddings=embeddings_np,
-                metadatas=metadatas_sanitized,
+
+    def upsert_table(self, table: ActionTable) -> None:
+        """Upsert an ActionTable (with embeddings) as Chroma records."""
+        self.upsert_actions(
+            ids=table.ids,
+            documents=table.documents,
+            embeddings=table.embeddings,
+            metadatas=table.metadatas(),
+        )
+
+    def _batch_size(self) -> int:
+        try:
+            return int(self.client.get_max_batch_size())
+        except Exception:  # pragma: no cover
+            return 5000
+
+    def get_content_hashes(self) -> Dict[str, str]:
+        """Return {action id: content hash} for every stored action.
+
+        Actions indexed before hashes were recorded map to an empty string.
+        """
+        out: Dict[str, str] = {}
+        step = self._batch_size()
+        offset = 0
+        from chromadb.api.types import IncludeEnum
+
+        while True:
+            page = self.collection.get(
+                include=[IncludeEnum.metadatas], limit=step, offset=offset
             )
+            ids = page.get("ids") or []
+            metas = page.get("metadatas") or []
+            for i, _id in enumerate(ids):
+                meta = metas[i] if i < len(metas) else None
+                out[_id] = str((meta or {}).get("content_hash") or "")
+            if len(ids) < step:
+                return out
+            offset += step
+
+    def delete_actions(self, ids: Sequence[str]) -> None:
+        """Remove actions by id."""
+        ids = list(ids)
+        step = self._batch_size()
+        for i in range(0, len(ids), step):
+            self.collection.delete(ids=ids[i : i + step])
 
     def query_by_embedding(
         self, embedding: List[float], top_k: int = 5
@@ -100,8 +186,22 @@ class ActionVectorStore:
 
         Returns list of dicts: {id, similarity, metadata, document}
         """
+        return self.query_by_embeddings([embedding], top_k=top_k)[0]
+
+    def query_by_embeddings(
+        self, embeddings: Any, top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """Query similar actions for many embeddings in a single round trip.
+
+        Returns one list of {id, similarity, metadata, document} per query,
+        in the same order as ``embeddings``.
+        """
+        if len(embeddings) == 0:
+            return []
+        from chromadb.api.types import IncludeEnum
+
         res = self.collection.query(
-            query_embeddings=[list(embedding)],
+            query_embeddings=np.asarray(embeddings, dtype=np.float32),
             n_results=top_k,
             include=[
                 IncludeEnum.distances,
@@ -109,21 +209,217 @@ class ActionVectorStore:
                 IncludeEnum.documents,
             ],
         )
-        ids = (res.get("ids") or [[]])[0]
-        dists = (res.get("distances") or [[]])[0]
-        metas = (res.get("metadatas") or [[]])[0]
-        docs = (res.get("documents") or [[]])[0]
+        all_ids = res.get("ids") or []
+        all_dists = res.get("distances") or []
+        all_metas = res.get("metadatas") or []
+        all_docs = res.get("documents") or []
+
+        results: List[List[Dict[str, Any]]] = []
+        for q in range(len(embeddings)):
+            ids = all_ids[q] if q < len(all_ids) else []
+            dists = all_dists[q] if q < len(all_dists) else []
+            metas = all_metas[q] if q < len(all_metas) else []
+            docs = all_docs[q] if q < len(all_docs) else []
+
+            out: List[Dict[str, Any]] = []
+            for i, _id in enumerate(ids):
+                dist = float(dists[i]) if i < len(dists) else 1.0
+                sim = max(0.0, min(1.0, 1.0 - dist))  # cosine distance → similarity
+                out.append(
+                    {
+                        "id": _id,
+                        "similarity": sim,
+                        "metadata": metas[i] if i < len(metas) else {},
+                        "document": docs[i] if i < len(docs) else "",
+                    }
+                )
+            results.append(out)
+        return results
+
+
+class InMemoryVectorStore:
+    """Exact cosine top-k search over an in-memory float32 matrix.
 
-        out: List[Dict[str, Any]] = []
+    - Rows are L2-normalized on insert, so a dot product is the cosine similarity
+    - All queries are scored with one matrix product and ``argpartition``
+    - Metadata is kept column-wise; dicts are only built for returned matches
+    - ``precision="float16"`` / ``"int8"`` stores the matrix quantized
+      (2x / ~4x smaller) and scores directly on the quantized rows
+    - Nothing is persisted; the index lives as long as the process
+    """
+
+    # Upper bound on the (queries x actions) score block held in memory at once
+    max_score_elements = 32 * 1024 * 1024
+
+    def __init__(self, precision: str = "float32") -> None:
+        self.precision = precision
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix = QuantizedMatrix(precision)
+        self._documents: List[str] = []
+        self._columns: Dict[str, List[Union[str, int, float, bool]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _normalize(arr: Any) -> np.ndarray:
+        mat = np.asarray(arr, dtype=np.float32)
+        if mat.ndim == 1:
+            mat = mat.reshape(1, -1)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        return mat / norms
+
+    def _upsert_columns(
+        self,
+        ids: List[str],
+        documents: Sequence[str],
+        embeddings: Any,
+        columns: Mapping[str, Sequence[Any]],
+    ) -> None:
+        if not ids:
+            return
+        vecs = self._normalize(embeddings)
+        if len(self._ids) == 0:
+            self._matrix = QuantizedMatrix(self.precision, dim=vecs.shape[1])
+        for key in columns:
+            if key not in self._columns:
+                self._columns[key] = [""] * len(self._ids)
+
+        # position of each new row -> index of its (last) source row, so an id
+        # repeated within one call resolves last-write-wins like Chroma
+        new_rows: Dict[int, int] = {}
         for i, _id in enumerate(ids):
-            dist = float(dists[i]) if i < len(dists) else 1.0
-            sim = max(0.0, min(1.0, 1.0 - dist))  # convert cosine distance → similarity
-            out.append(
-                {
-                    "id": _id,
-                    "similarity": sim,
-                    "metadata": metas[i] if i < len(metas) else {},
-                    "document": docs[i] if i < len(docs) else "",
-                }
-            )
-        return out
+            pos = self._positions.get(_id)
+            if pos is None:
+                pos = len(self._ids)
+                self._positions[_id] = pos
+                self._ids.append(_id)
+                self._documents.append(documents[i])
+                for col in self._columns.values():
+                    col.append("")
+                new_rows[pos] = i
+            elif pos in new_rows:
+                new_rows[pos] = i
+                self._documents[pos] = documents[i]
+            else:
+                self._matrix.assign(pos, vecs[i])
+                self._documents[pos] = documents[i]
+            for key, values in columns.items():
+                self._columns[key][pos] = _sanitize_value(values[i])
+        if new_rows:
+            self._matrix.append(vecs[list(new_rows.values())])
+
+    def upsert_actions(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        embeddings: Any,
+        metadatas: Sequence[Mapping[str, Union[str, int, float, bool]]],
+    ) -> None:
+        """Insert new actions and overwrite existing ones in place."""
+        metadatas = list(metadatas)
+        keys = list(dict.fromkeys(k for m in metadatas for k in m))
+        columns = {k: [m.get(k) for m in metadatas] for k in keys}
+        self._upsert_columns(list(ids), list(documents), embeddings, columns)
+
+    def upsert_table(self, table: ActionTable) -> None:
+        """Insert/overwrite actions straight from an ActionTable's columns."""
+        self._upsert_columns(
+            table.ids, table.documents, table.embeddings, table.columns()
+        )
+
+    def delete_actions(self, ids: Sequence[str]) -> None:
+        """Remove actions by id."""
+        drop = {self._positions[i] for i in ids if i in self._positions}
+        if not drop:
+            return
+        keep = [p for p in range(len(self._ids)) if p not in drop]
+        self._matrix.take(keep)
+        self._ids = [self._ids[p] for p in keep]
+        self._documents = [self._documents[p] for p in keep]
+        self._columns = {
+            k: [col[p] for p in keep] for k, col in self._columns.items()
+        }
+        self._positions = {_id: p for p, _id in enumerate(self._ids)}
+
+    def get_content_hashes(self) -> Dict[str, str]:
+        """Return {action id: content hash} for every stored action."""
+        hashes = self._columns.get("content_hash") or [""] * len(self._ids)
+        return {_id: str(h or "") for _id, h in zip(self._ids, hashes)}
+
+    def _metadata(self, pos: int) -> Dict[str, Union[str, int, float, bool]]:
+        return {k: col[pos] for k, col in self._columns.items()}
+
+    def query_by_embedding(
+        self, embedding: List[float], top_k: int = 5
+    ) -> List[Dict[str, Any]]:
+        """Query similar actions by embedding.
+
+        Returns list of dicts: {id, similarity, metadata, document}
+        """
+        return self.query_by_embeddings([embedding], top_k=top_k)[0]
+
+    def query_by_embeddings(
+        self, embeddings: Any, top_k: int = 5
+    ) -> List[List[Dict[str, Any]]]:
+        """Exact top-k for every query, in the same order as ``embeddings``."""
+        if len(embeddings) == 0:
+            return []
+        n_actions = len(self._ids)
+        k = min(int(top_k), n_actions)
+        if k <= 0:
+            return [[] for _ in range(len(embeddings))]
+
+        queries = self._normalize(embeddings)
+        block = max(1, self.max_score_elements // n_actions)
+        results: List[List[Dict[str, Any]]] = []
+        for start in range(0, queries.shape[0], block):
+            scores = self._matrix.scores(queries[start : start + block])
+            if k < n_actions:
+                idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                idx = np.broadcast_to(np.arange(n_actions), scores.shape)
+            top = np.take_along_axis(scores, idx, axis=1)
+            order = np.argsort(-top, axis=1, kind="stable")
+            idx = np.take_along_axis(idx, order, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            for row_idx, row_sims in zip(idx, top):
+                results.append(
+                    [
+                        {
+                            "id": self._ids[p],
+                            "similarity": max(0.0, min(1.0, float(sim))),
+                            "metadata": self._metadata(p),
+                            "document": self._documents[p],
+                        }
+                        for p, sim in zip(row_idx, row_sims)
+                    ]
+                )
+        return results
+
+
+VECTOR_BACKENDS = ("chroma", "memory")
+
+
+def create_vector_store(
+    backend: str = "chroma",
+    persist_directory: str = "chroma_db",
+    precision: str = "float32",
+    collection_name: str = "actions",
+) -> VectorBackend:
+    """Build the vector backend named ``backend`` ("chroma" or "memory").
+
+    ``precision`` applies to the in-memory backend; ChromaDB always stores
+    float32 vectors. ``collection_name`` selects the ChromaDB collection.
+    """
+    if backend == "chroma":
+        return ActionVectorStore(
+            persist_directory=persist_directory, collection_name=collection_name
+        )
+    if backend == "memory":
+        return InMemoryVectorStore(precision=precision)
+    raise ValueError(
+        f"Unknown vector backend: {backend!r}; expected one of {VECTOR_BACKENDS}"
+    )
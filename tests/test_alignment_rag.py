@@ -14,7 +14,7 @@ def test_alignment_and_rag_generate():
     actions = load_actions(Path("data/action.json"))
 
     # Run alignment
-    engine = AlignmentEngine()
+    engine = AlignmentEngine(autotune=False)
     result = engine.align(strategies=strategies, actions=actions, top_k=3)
 
     # Basic shape checks
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from src.alignment import AlignmentEngine
+from src.autotune import autotune, load_tuned_config, save_tuned_config
+from src.synthetic import HashEmbedder, synthetic_actions
+from src.text_utils import action_to_text
+
+
+def test_autotune_reports_best_config_and_persists_per_model(tmp_path):
+    texts = [action_to_text(a) for a in synthetic_actions(200, length_spread=0.8)]
+    report = autotune(HashEmbedder(64), texts, budgets=[256, 4096], sample_size=64)
+
+    assert [t["token_budget"] for t in report["trials"]] == [256, 4096]
+    best = report["best"]
+    assert best["sample_size"] == 64
+    assert best["texts_per_s"] == max(t["texts_per_s"] for t in report["trials"])
+
+    path = tmp_path / "configs.json"
+    save_tuned_config("model-a", best, path)
+    save_tuned_config("model-b", {"token_budget": 123}, path)
+    assert load_tuned_config("model-a", path)["token_budget"] == best["token_budget"]
+    assert load_tuned_config("model-b", path) == {"token_budget": 123}
+    assert load_tuned_config("model-c", path) is None
+
+
+def test_engine_picks_up_tuned_token_budget(tmp_path, monkeypatch):
+    monkeypatch.setenv("EMBEDDING_AUTOTUNE_PATH", str(tmp_path / "configs.json"))
+    monkeypatch.delenv("EMBEDDING_TOKEN_BUDGET", raising=False)
+    save_tuned_config("tuned-model", {"token_budget": 2048, "threads": None})
+
+    def engine(**kwargs):
+        return AlignmentEngine(
+            model_name="tuned-model",
+            cache_directory=None,
+            vector_backend="memory",
+            embedder=HashEmbedder(),
+            **kwargs,
+        )
+
+    assert engine().token_budget == 2048
+    assert engine(token_budget=512).token_budget == 512
+    assert engine(autotune=False).token_budget == 8192
+
+
+def test_tuned_threads_apply_only_around_encode(tmp_path, monkeypatch):
+    import sys
+    import types
+
+    import src.alignment as alignment
+
+    fake_torch = types.SimpleNamespace(threads=8)
+    fake_torch.get_num_threads = lambda: fake_torch.threads
+    fake_torch.set_num_threads = lambda n: setattr(fake_torch, "threads", n)
+    monkeypatch.setitem(sys.modules, "torch", fake_torch)
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    monkeypatch.setenv("EMBEDDING_AUTOTUNE_PATH", str(tmp_path / "configs.json"))
+
+    seen = []
+
+    class Recording(HashEmbedder):
+        def encode(self, texts, **kwargs):
+            seen.append(fake_torch.threads)
+            return super().encode(texts, **kwargs)
+
+    monkeypatch.setattr(alignment, "get_embedder", lambda *a: Recording())
+
+    def engine(backend):
+        return AlignmentEngine(
+            model_name="m",
+            cache_directory=None,
+            vector_backend="memory",
+            backend=backend,
+            token_budget=0,
+        )
+
+    save_tuned_config("m", {"threads": 2})
+    torch_engine = engine("torch")
+    assert fake_torch.threads == 8  # construction leaves the process alone
+    torch_engine._embed_texts(["a b", "c"])
+    assert seen == [2] and fake_torch.threads == 8
+
+    save_tuned_config("m#onnx", {"threads": 2})
+    assert engine("onnx").encode_threads is None
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.batching import encode_bucketed, padded_tokens, token_budget_batches
+from src.synthetic import HashEmbedder
+
+
+def test_token_budget_batches_cover_every_index_within_budget():
+    rng = np.random.default_rng(0)
+    lengths = rng.integers(3, 200, size=500)
+    batches = token_budget_batches(lengths, max_tokens=1024, max_batch_size=64)
+
+    flat = np.concatenate(batches)
+    assert sorted(flat.tolist()) == list(range(500))
+    for b in batches:
+        assert len(b) <= 64
+        assert len(b) * lengths[b].max() <= 1024
+    fixed = [np.arange(i, min(i + 32, 500)) for i in range(0, 500, 32)]
+    assert padded_tokens(lengths, batches) < padded_tokens(lengths, fixed)
+
+    # A text longer than the budget still gets its own batch
+    assert [b.tolist() for b in token_budget_batches([5000, 1], 100)] == [[0], [1]]
+
+
+def test_encode_bucketed_restores_input_order():
+    texts = [("word " * n).strip() for n in (30, 1, 12, 50, 3, 3, 80)]
+    embedder = HashEmbedder(32)
+    out = encode_bucketed(embedder, texts, max_tokens=64)
+    assert np.allclose(out, embedder.encode(texts))
+
+
+class _BorrowCheckingModel:
+    """Fails like an HF fast tokenizer ("Already borrowed") on concurrent use."""
+
+    def __init__(self) -> None:
+        import threading
+
+        self._busy = threading.Lock()
+        self.embedder = HashEmbedder(16)
+
+    def _exclusive(self):
+        import time
+
+        if not self._busy.acquire(blocking=False):
+            raise RuntimeError("Already borrowed")
+        time.sleep(0.001)
+        self._busy.release()
+
+    def tokenizer(self, texts, **kwargs):
+        self._exclusive()
+        return {"input_ids": [t.split() for t in texts]}
+
+    def encode(self, texts, **kwargs):
+        self._exclusive()
+        return self.embedder.encode(texts, **kwargs)
+
+
+def test_shared_embedder_tokenizes_under_its_lock():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.model_registry import SharedEmbedder
+
+    shared = SharedEmbedder(_BorrowCheckingModel(), "m", None)
+    texts = [("word " * n).strip() for n in range(1, 40)]
+    assert shared.token_lengths(["a b c"]).tolist() == [3]
+    with ThreadPoolExecutor(8) as pool:
+        outs = list(
+            pool.map(lambda _: encode_bucketed(shared, texts, max_tokens=64), range(16))
+        )
+    assert all(np.allclose(o, outs[0]) for o in outs)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from scripts.benchmark_pipeline import compare_reports
+from src.synthetic import HashEmbedder, synthetic_actions, synthetic_strategies
+
+
+def test_synthetic_plans_are_deterministic():
+    assert synthetic_strategies(5, seed=3) == synthetic_strategies(5, seed=3)
+    actions = synthetic_actions(5, words=12)
+    assert actions == synthetic_actions(5, words=12)
+    assert len(actions[0].description.split()) == 12
+
+    embs = HashEmbedder(dim=64).encode(["supplier lanes", "supplier lanes", "audit"])
+    assert embs.shape == (3, 64)
+    assert np.allclose(np.linalg.norm(embs, axis=1), 1.0)
+    assert np.allclose(embs[0], embs[1])
+
+
+def test_compare_reports_flags_only_slow_stages():
+    def _report(align_s: float, tiny_s: float, backend: str = "memory") -> dict:
+        return {
+            "runs": [
+                {
+                    "strategies": 10,
+                    "actions": 100,
+                    "words": 30,
+                    "config": {"backend": backend, "embedder": "hash"},
+                    "stages": {
+                        "align": {"seconds": align_s},
+                        "tiny": {"seconds": tiny_s},
+                    },
+                }
+            ]
+        }
+
+    baseline = _report(1.0, 0.001)
+    assert compare_reports(_report(1.2, 0.01), baseline, tolerance=0.25) == []
+    regressions = compare_reports(_report(2.0, 0.01), baseline, tolerance=0.25)
+    assert [r["stage"] for r in regressions] == ["align"]
+    assert regressions[0]["ratio"] == 2.0
+
+    with pytest.raises(ValueError, match="different configuration"):
+        compare_reports(_report(1.0, 0.001, backend="chroma"), baseline)
+
+
+def test_run_size_times_scoring_as_its_own_stage():
+    from scripts.benchmark_pipeline import run_size
+
+    run = run_size(
+        5, 40, words=8, embedder="hash", backend="memory", top_k=3, matrix=True, seed=0
+    )
+    assert run["config"]["mode"] == "top_k+matrix"
+    for stage in ("align_query", "align_scoring", "align_matrix_scoring"):
+        assert run["stages"][stage]["items"] == 5
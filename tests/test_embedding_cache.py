@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from src.embedding_cache import EmbeddingCache
+
+
+def test_embedding_cache_hits_misses_and_lru(tmp_path):
+    cache = EmbeddingCache(tmp_path, max_entries=2)
+    model = "test-model"
+
+    assert cache.get_many(model, ["alpha", "beta"]) == [None, None]
+    cache.put_many(model, ["alpha", "beta"], [[1.0, 0.0], [0.0, 1.0]])
+
+    # Whitespace-normalized text maps to the same entry
+    got = cache.get_many(model, ["alpha", "  beta "])
+    assert got == [[1.0, 0.0], [0.0, 1.0]]
+    # Different model name is a different key
+    assert cache.get_many("other-model", ["alpha"]) == [None]
+
+    # Touch "alpha" so "beta" becomes least recently used, then overflow the cap
+    cache.get_many(model, ["alpha"])
+    cache.put_many(model, ["gamma"], [[0.5, 0.5]])
+    assert len(cache) == 2
+    assert cache.get_many(model, ["beta"]) == [None]
+    assert cache.get_many(model, ["alpha"])[0] == [1.0, 0.0]
+
+    stats = cache.stats()
+    assert stats["hits"] == 4
+    assert stats["misses"] == 4
+    assert stats["entries"] == 2
+
+    # Persisted across instances
+    cache.close()
+    reopened = EmbeddingCache(tmp_path, max_entries=2)
+    assert reopened.get_many(model, ["gamma"])[0] == [0.5, 0.5]
+
+
+def test_engine_embeddings_are_float32_arrays_in_input_order(tmp_path):
+    import numpy as np
+
+    from src.alignment import AlignmentEngine
+    from src.synthetic import HashEmbedder
+
+    embedder = HashEmbedder(16)
+    engine = AlignmentEngine(
+        vector_backend="memory",
+        embedder=embedder,
+        cache_directory=str(tmp_path),
+        autotune=False,
+    )
+    engine._embed_texts(["b"])
+    out = engine._embed_texts(["a", "b", "c", "a"])
+    assert out.dtype == np.float32 and out.flags["C_CONTIGUOUS"]
+    assert np.allclose(out, embedder.encode(["a", "b", "c", "a"]))
+    assert engine.cache_stats()["hits"] == 1
+
+
+def test_int8_and_float32_engines_share_a_cache_directory(tmp_path):
+    import numpy as np
+
+    from src.alignment import AlignmentEngine
+    from src.synthetic import HashEmbedder
+
+    embedder = HashEmbedder(32)
+    texts = ["alpha beta", "gamma delta"]
+
+    def engine(precision):
+        return AlignmentEngine(
+            vector_backend="memory",
+            embedder=embedder,
+            cache_directory=str(tmp_path),
+            precision=precision,
+            autotune=False,
+        )
+
+    lossy = engine("int8")
+    lossy._embed_texts(texts)
+    exact = engine("float32")
+    # The int8 entries are not served to the float32 engine
+    assert np.array_equal(exact._embed_texts(texts), embedder.encode(texts))
+    assert exact.cache_stats()["hits"] == 0
+    again = engine("float32")
+    again._embed_texts(texts)
+    assert again.cache_stats()["hits"] == 2
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.encoder_pool import EncoderPool
+from src.synthetic import HashEmbedder, load_hash_embedder
+
+
+def test_encoder_pool_shards_and_keeps_input_order():
+    texts = [f"action {i} " + "supplier lanes " * (i % 7) for i in range(50)]
+    with EncoderPool(
+        "hash",
+        workers=2,
+        batch_size=4,
+        threads_per_worker=1,
+        shard_size=6,
+        model_factory=load_hash_embedder,
+        token_budget=64,
+    ) as pool:
+        out = pool.encode(texts, normalize_embeddings=True)
+        assert pool.encode([]).shape == (0, 0)
+
+    assert out.dtype == np.float32
+    assert np.allclose(out, HashEmbedder().encode(texts))
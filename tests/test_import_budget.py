@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY = ["torch", "transformers", "sentence_transformers", "chromadb"]
+
+
+def _loaded_after_import(modules: list[str]) -> list[str]:
+    code = (
+        "import json, sys\n"
+        + "".join(f"import {m}\n" for m in modules)
+        + f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_lightweight_modules_do_not_load_heavy_dependencies():
+    assert (
+        _loaded_after_import(
+            ["src.models", "src.text_utils", "src.recommendations", "src.io_utils"]
+        )
+        == []
+    )
+
+
+def test_alignment_defers_model_and_store_imports():
+    assert _loaded_after_import(["src.alignment", "src.vector_store"]) == []
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pytest
+
+from src.alignment import AlignmentEngine
+from src.synthetic import HashEmbedder, synthetic_actions
+from src.text_utils import action_to_text
+
+
+class CountingEmbedder(HashEmbedder):
+    def __init__(self) -> None:
+        super().__init__(64)
+        self.encoded: list[str] = []
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        self.encoded.extend(texts)
+        return super().encode(texts, normalize_embeddings=normalize_embeddings)
+
+
+@pytest.mark.parametrize("backend", ["memory", "chroma"])
+def test_incremental_sync_reembeds_changed_and_deletes_removed(tmp_path, backend):
+    embedder = CountingEmbedder()
+    engine = AlignmentEngine(
+        model_name="m",
+        persist_directory=str(tmp_path / "chroma"),
+        cache_directory=None,
+        vector_backend=backend,
+        embedder=embedder,
+        autotune=False,
+        timings=False,
+    )
+    actions = synthetic_actions(6)
+    engine.index_actions(actions)
+    assert len(embedder.encoded) == 6
+
+    edited = actions[1].model_copy(update={"description": "brand new scope"})
+    kept = [actions[0], edited, *actions[3:]]  # A3 removed
+    embedder.encoded.clear()
+    ids, _, _ = engine.index_actions(kept)
+
+    assert ids == ["A2"]
+    assert embedder.encoded == [action_to_text(edited)]
+    assert set(engine.store.get_content_hashes()) == {a.id for a in kept}
+
+    # Nothing changed: nothing re-encoded, nothing deleted
+    embedder.encoded.clear()
+    assert engine.index_actions(kept)[0] == []
+    assert embedder.encoded == []
+    assert len(engine.store.get_content_hashes()) == 5
+
+
+def test_engines_on_separate_collections_do_not_delete_each_others_actions(tmp_path):
+    def engine(collection):
+        return AlignmentEngine(
+            model_name="m",
+            persist_directory=str(tmp_path / "chroma"),
+            cache_directory=None,
+            vector_backend="chroma",
+            embedder=HashEmbedder(),
+            autotune=False,
+            collection_name=collection,
+        )
+
+    first, second = engine("actions_a"), engine("actions_b")
+    first.index_actions(synthetic_actions(4))
+    second.index_actions(synthetic_actions(2, seed=7))
+    assert len(first.store.get_content_hashes()) == 4
+    assert len(second.store.get_content_hashes()) == 2
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.alignment import AlignmentEngine
+from src.inference_backends import (
+    agreement_report,
+    check_backend,
+    embedding_id,
+    pool_hidden_states,
+)
+from src.synthetic import HashEmbedder
+
+
+def test_pooling_matches_sentence_transformer_modes():
+    hidden = np.array(
+        [[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]], [[5.0, 0.0], [7.0, 2.0], [9.0, 4.0]]],
+        dtype=np.float32,
+    )
+    mask = np.array([[1, 1, 0], [1, 1, 1]])
+    assert np.allclose(pool_hidden_states(hidden, mask, "mean"), [[2, 3], [7, 2]])
+    assert np.allclose(pool_hidden_states(hidden, mask, "cls"), [[1, 2], [5, 0]])
+    assert np.allclose(pool_hidden_states(hidden, mask, "max"), [[3, 4], [9, 4]])
+
+
+def test_agreement_report_scores_cosine_and_top_k_overlap():
+    rng = np.random.default_rng(0)
+    ref = rng.normal(size=(200, 32)).astype(np.float32)
+    queries = rng.normal(size=(10, 32)).astype(np.float32)
+
+    same = agreement_report(ref, ref * 3.0, queries, queries, top_k=5)
+    assert same["cosine"]["min"] == pytest.approx(1.0)
+    assert same["recall_at_k"] == 1.0
+
+    noisy = ref + rng.normal(scale=0.5, size=ref.shape).astype(np.float32)
+    drift = agreement_report(ref, noisy, queries, queries, top_k=5)
+    assert drift["cosine"]["mean"] < 1.0
+    assert drift["recall_at_k"] < 1.0
+
+
+def test_backend_selection_namespaces_cache_entries(tmp_path):
+    with pytest.raises(ValueError):
+        check_backend("tensorrt")
+    assert embedding_id("m", "torch") == "m"
+    assert embedding_id("m", "onnx") == "m#onnx"
+
+    def engine(backend):
+        return AlignmentEngine(
+            model_name="m",
+            cache_directory=str(tmp_path / "cache"),
+            vector_backend="memory",
+            embedder=HashEmbedder(),
+            backend=backend,
+            autotune=False,
+        )
+
+    engine("torch")._embed_texts(["shared text"])
+    onnx = engine("onnx")
+    onnx._embed_texts(["shared text"])
+    assert onnx.cache_stats()["hits"] == 0
+
+
+class _FakeTokenizer:
+    """Word-level tokenizer: id = word length, padded with 0 like HF ``np`` output."""
+
+    def __call__(self, texts, padding, truncation, max_length, return_tensors):
+        ids = [[len(w) for w in t.split()][:max_length] for t in texts]
+        width = max(len(x) for x in ids)
+        input_ids = np.zeros((len(ids), width), dtype=np.int64)
+        mask = np.zeros_like(input_ids)
+        for i, x in enumerate(ids):
+            input_ids[i, : len(x)] = x
+            mask[i, : len(x)] = 1
+        return {"input_ids": input_ids, "attention_mask": mask}
+
+
+def _hidden(input_ids):
+    # Token state depends only on its id, so padding never changes a row
+    ids = input_ids.astype(np.float32)[:, :, None]
+    return np.concatenate([ids, ids**2, np.ones_like(ids)], axis=2)
+
+
+class _FakeSession:
+    def __init__(self, path, options, providers):
+        self.options = options
+        self.batches = []
+
+    def run(self, outputs, feeds):
+        assert outputs == ["last_hidden_state"]
+        self.batches.append(feeds["input_ids"].shape[0])
+        return [_hidden(feeds["input_ids"])]
+
+
+def test_onnx_encoder_pools_normalizes_and_restores_order(tmp_path, monkeypatch):
+    import json
+    import sys
+    import types
+
+    import onnxruntime
+
+    from src.inference_backends import ONNX_FORMAT, OnnxEncoder
+
+    fake_transformers = types.ModuleType("transformers")
+    fake_transformers.AutoTokenizer = types.SimpleNamespace(
+        from_pretrained=lambda path: _FakeTokenizer()
+    )
+    monkeypatch.setitem(sys.modules, "transformers", fake_transformers)
+    monkeypatch.setattr(onnxruntime, "InferenceSession", _FakeSession)
+    (tmp_path / "export.json").write_text(
+        json.dumps(
+            {
+                "format": ONNX_FORMAT,
+                "input_names": ["input_ids", "attention_mask"],
+                "pooling": "mean",
+                "max_seq_length": 8,
+                "normalize": False,
+            }
+        )
+    )
+
+    encoder = OnnxEncoder(tmp_path, threads=2)
+    assert encoder.session.options.intra_op_num_threads == 2
+    texts = ["a bb", "ccc dddd eeeee ff g", "hh", "iii jjjj k", "l"]
+    out = encoder.encode(texts, batch_size=2, normalize_embeddings=True)
+
+    assert out.dtype == np.float32 and out.shape == (5, 3)
+    assert encoder.session.batches == [2, 2, 1]
+    for row, text in zip(out, texts):
+        enc = _FakeTokenizer()([text], True, True, 8, "np")
+        expected = pool_hidden_states(
+            _hidden(enc["input_ids"]), enc["attention_mask"], "mean"
+        )[0]
+        np.testing.assert_allclose(row, expected / np.linalg.norm(expected), rtol=1e-5)
+
+    raw = encoder.encode(texts[:1])
+    assert np.linalg.norm(raw[0]) > 1.0
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+
+from src.alignment import AlignmentEngine
+from src.instrumentation import StageTimings, to_json_lines, to_prometheus
+from src.synthetic import HashEmbedder, synthetic_actions, synthetic_strategies
+
+
+def test_stage_timings_accumulate_and_export():
+    timings = StageTimings()
+    with timings.span("encode", items=3):
+        pass
+    with timings.span("encode") as span:
+        span.items = 2
+    stats = timings.as_dict()["encode"]
+    assert stats["calls"] == 2 and stats["items"] == 5
+    assert stats["wall_seconds"] >= 0 and stats["cpu_seconds"] >= 0
+
+    prom = to_prometheus(timings.as_dict(), labels={"run": 'a"b'})
+    assert "# TYPE alignment_stage_wall_seconds gauge" in prom
+    assert 'alignment_stage_items{run="a\\"b",stage="encode"} 5' in prom
+
+    line = json.loads(to_json_lines(timings.as_dict(), run="x"))
+    assert line["run"] == "x" and line["stage"] == "encode"
+
+    disabled = StageTimings(enabled=False)
+    with disabled.span("encode", items=1) as span:
+        span.items = 4
+    assert disabled.as_dict() == {}
+
+
+def test_align_attaches_stage_timings():
+    strategies = synthetic_strategies(4)
+    actions = synthetic_actions(20)
+    engine = AlignmentEngine(
+        vector_backend="memory",
+        embedder=HashEmbedder(64),
+        cache_directory=None,
+        autotune=False,
+    )
+    result = engine.align(strategies, actions, top_k=3)
+    timings = result["timings"]
+    for stage in ("text_build", "content_hash", "encode", "store_upsert", "query"):
+        assert stage in timings
+    assert timings["store_upsert"]["items"] == 20
+    assert timings["align_total"]["calls"] == 1
+
+    # Reset after each align; unchanged actions are not re-written
+    again = engine.align(strategies, actions, top_k=3)["timings"]
+    assert "store_upsert" not in again
+
+    quiet = AlignmentEngine(
+        vector_backend="memory",
+        embedder=HashEmbedder(64),
+        cache_directory=None,
+        timings=False,
+        autotune=False,
+    )
+    assert "timings" not in quiet.align(strategies, actions, top_k=3)
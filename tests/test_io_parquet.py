@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.io_utils import (
+    load_alignment_output,
+    load_alignment_parquet,
+    write_alignment_parquet,
+)
+
+pytest.importorskip("pyarrow")
+
+
+def _payload() -> dict:
+    strategy_results = [
+        {
+            "strategy_id": f"S{i}",
+            "strategy_title": f"Strategy {i}",
+            "avg_top3_similarity": 0.5 + i / 10,
+            "alignment_label": "Medium",
+            "top_matches": [
+                {
+                    "action_id": f"A{j}",
+                    "title": f"Action {j}",
+                    "owner": "Ops",
+                    "start_date": None,
+                    "end_date": "2026-06-30",
+                    "similarity": 0.9 - j / 10,
+                    "alignment_label": "Strong",
+                }
+                for j in range(3)
+            ],
+        }
+        for i in range(2)
+    ]
+    return {
+        "result": {
+            "overall_score": 55.0,
+            "coverage_percent": 50.0,
+            "strategy_results": strategy_results,
+            "similarity_matrix": {
+                "shape": [2, 3],
+                "floor": 0.3,
+                "strategy_ids": ["S0", "S1"],
+                "action_ids": ["A0", "A1", "A2"],
+                "indptr": [0, 2, 3],
+                "indices": [0, 2, 1],
+                "values": [0.9, 0.4, 0.7],
+            },
+        },
+        "recommendations": [{"strategy_id": "S0", "suggestions": ["x"]}],
+    }
+
+
+def test_parquet_round_trip_matches_json(tmp_path):
+    payload = _payload()
+    manifest = write_alignment_parquet(payload, tmp_path / "out")
+    meta = json.loads(manifest.read_text(encoding="utf-8"))
+    assert meta["files"]["matches"]["rows"] == 6
+    assert meta["recommendations"] == payload["recommendations"]
+    assert "strategy_results" not in meta["result"]
+
+    json_path = tmp_path / "out.json"
+    json_path.write_text(json.dumps(payload), encoding="utf-8")
+    from_json = load_alignment_output(json_path)
+    from_parquet = load_alignment_output(tmp_path / "out")
+    assert from_parquet["strategy_results"] == from_json["strategy_results"]
+    assert from_parquet["result"]["overall_score"] == 55.0
+
+    loaded = load_alignment_parquet(
+        manifest, match_columns=["strategy_id", "similarity"], include_similarity=True
+    )
+    assert list(loaded["matches"].columns) == ["strategy_id", "similarity"]
+    sim = loaded["similarity"]
+    assert list(zip(sim["strategy_id"], sim["action_id"])) == [
+        ("S0", "A0"),
+        ("S0", "A2"),
+        ("S1", "A1"),
+    ]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import src.kv_cache as kv_cache
+from src.kv_cache import JsonCache
+
+
+def test_json_cache_entries_expire_after_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(kv_cache.time, "time", lambda: now[0])
+    cache = JsonCache(tmp_path / "cache.sqlite3", ttl_seconds=0.5)
+
+    cache.set("a", {"v": 1})
+    assert cache.get("a") == {"v": 1}
+    now[0] += 0.4
+    assert cache.get("a") == {"v": 1}
+    now[0] += 0.2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+    # Expired entries are also swept on the next write
+    cache.set("b", 1)
+    now[0] += 1.0
+    cache.set("c", 2)
+    assert len(cache) == 1 and cache.get("c") == 2
+    assert cache.stats()["hits"] == 3 and cache.stats()["misses"] == 1
+
+
+def test_json_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(kv_cache.time, "time", lambda: now[0])
+    cache = JsonCache(tmp_path / "cache.sqlite3", max_entries=2)
+
+    cache.set("a", "A")
+    now[0] += 1
+    cache.set("b", "B")
+    now[0] += 1
+    assert cache.get("a") == "A"  # "b" is now least recently used
+    now[0] += 1
+    cache.set("c", "C")
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+    # Persisted across instances
+    cache.close()
+    reopened = JsonCache(tmp_path / "cache.sqlite3", max_entries=2)
+    assert reopened.get("c") == "C"
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import types
+
+import pytest
+
+from src import llm_client
+from src.llm_client import (
+    RateLimiter,
+    TokenBucket,
+    acall_with_retries,
+    call_with_retries,
+    get_client,
+)
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int, retry_after: str | None = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        if retry_after is not None:
+            self.response = types.SimpleNamespace(headers={"retry-after": retry_after})
+
+
+def test_token_bucket_reports_wait_once_budget_is_spent():
+    bucket = TokenBucket(rate_per_minute=60)  # 1 token per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(2) == pytest.approx(2.0, abs=0.05)
+
+
+def test_call_with_retries_retries_429_then_succeeds(monkeypatch):
+    sleeps: list[float] = []
+    monkeypatch.setattr(llm_client.time, "sleep", sleeps.append)
+    outcomes = [_StatusError(429), _StatusError(503), "ok"]
+
+    def fn():
+        out = outcomes.pop(0)
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    assert call_with_retries(fn, 10, limiter=limiter, max_retries=3) == "ok"
+    assert len(sleeps) == 2
+
+
+def test_call_with_retries_does_not_retry_client_errors(monkeypatch):
+    monkeypatch.setattr(llm_client.time, "sleep", lambda s: None)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        raise _StatusError(400)
+
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    with pytest.raises(_StatusError):
+        call_with_retries(fn, 10, limiter=limiter, max_retries=3)
+    assert len(calls) == 1
+
+
+def test_acall_with_retries_backs_off_then_succeeds(monkeypatch):
+    sleeps: list[float] = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(llm_client.asyncio, "sleep", fake_sleep)
+    outcomes = [_StatusError(429, retry_after="3"), _StatusError(502), "ok"]
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        out = outcomes.pop(0)
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    result = asyncio.run(acall_with_retries(fn, 10, limiter=limiter, max_retries=3))
+    assert result == "ok" and len(calls) == 3
+    assert len(sleeps) == 2
+    assert sleeps[0] >= 3.0  # the server's retry-after floors the jittered backoff
+    assert 0.0 <= sleeps[1] <= 1.0  # second attempt: uniform(0, 0.5 * 2)
+
+
+def test_acall_with_retries_gives_up_after_max_retries(monkeypatch):
+    async def fake_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(llm_client.asyncio, "sleep", fake_sleep)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        raise _StatusError(503)
+
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=1_000_000)
+    with pytest.raises(_StatusError):
+        asyncio.run(acall_with_retries(fn, 10, limiter=limiter, max_retries=2))
+    assert len(calls) == 3
+
+
+def test_get_client_is_shared_per_endpoint(monkeypatch):
+    pytest.importorskip("openai")
+    monkeypatch.setattr(llm_client, "_CLIENTS", {})
+    client = get_client("test-key")
+    assert get_client("test-key") is client
+    assert client.max_retries == 0  # call_with_retries owns retries
+    assert get_client("test-key", "http://localhost:1/v1") is not client
+    assert get_client("other-key") is not client
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src import inference_backends, model_registry
+from src.synthetic import HashEmbedder
+
+
+class _SlowModel(HashEmbedder):
+    def __init__(self) -> None:
+        super().__init__(8)
+        self.active = 0
+        self.max_active = 0
+        self._count = threading.Lock()
+
+    def encode(self, texts, **kwargs):
+        with self._count:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.002)
+        with self._count:
+            self.active -= 1
+        return super().encode(texts, **kwargs)
+
+
+def test_registry_shares_one_model_per_key_and_serializes_encode(monkeypatch):
+    loads = []
+
+    def fake_load(model_name, device=None, backend="torch"):
+        loads.append((model_name, device, backend))
+        return _SlowModel()
+
+    monkeypatch.setattr(inference_backends, "load_model", fake_load)
+    model_registry.clear_registry()
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            handles = list(pool.map(lambda _: model_registry.get_embedder("m"), range(8)))
+        assert all(h is handles[0] for h in handles)
+        assert model_registry.get_embedder("m", None, "onnx") is not handles[0]
+        assert model_registry.get_embedder("m", "cpu") is not handles[0]
+        assert loads == [("m", None, "torch"), ("m", None, "onnx"), ("m", "cpu", "torch")]
+
+        shared = handles[0]
+        with ThreadPoolExecutor(8) as pool:
+            list(pool.map(lambda i: shared.encode([f"text {i}"]), range(32)))
+        assert shared.model.max_active == 1
+    finally:
+        model_registry.clear_registry()
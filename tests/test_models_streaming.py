@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.alignment import AlignmentEngine
+from src.models import (
+    ActionTask,
+    iter_action_batches,
+    iter_json_records,
+    load_actions,
+)
+from src.synthetic import HashEmbedder
+
+
+def _records(n: int) -> list[dict]:
+    return [
+        {
+            "id": f"A{i}",
+            "title": f"Action {i} with \"quotes\" and ] brackets",
+            "description": "Improve supplier lanes " * (i % 5),
+            "owner": "Ops",
+            "start_date": "2026-01-01",
+            "outputs": [f"out {i}"],
+        }
+        for i in range(n)
+    ]
+
+
+def test_iter_json_records_array_and_jsonl(tmp_path):
+    recs = _records(57)
+    arr = tmp_path / "actions.json"
+    arr.write_text(json.dumps(recs, indent=2), encoding="utf-8")
+    jsonl = tmp_path / "actions.jsonl"
+    jsonl.write_text("\n".join(json.dumps(r) for r in recs) + "\n", encoding="utf-8")
+
+    # Tiny chunks force records to straddle read boundaries
+    assert list(iter_json_records(arr, chunk_size=16)) == recs
+    assert list(iter_json_records(jsonl, chunk_size=16)) == recs
+
+    batches = list(iter_action_batches(jsonl, batch_size=10))
+    assert [len(b) for b in batches] == [10] * 5 + [7]
+    assert all(isinstance(a, ActionTask) for b in batches for a in b)
+    assert load_actions(arr) == [a for b in batches for a in b]
+    assert load_actions(Path("data/action.json"))
+
+
+def test_iter_json_records_rejects_empty_file_and_top_level_object(tmp_path):
+    empty = tmp_path / "empty.json"
+    empty.write_text("  \n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Empty JSON file"):
+        list(iter_json_records(empty))
+
+    obj = tmp_path / "object.json"
+    obj.write_text(json.dumps(_records(1)[0], indent=2), encoding="utf-8")
+    with pytest.raises(ValueError, match="multi-line top-level object"):
+        list(iter_json_records(obj))
+    with pytest.raises(ValueError):
+        load_actions(obj)
+
+
+def test_index_action_batches_matches_full_index(tmp_path):
+    path = tmp_path / "actions.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in _records(25)), encoding="utf-8")
+    engine = AlignmentEngine(
+        vector_backend="memory",
+        embedder=HashEmbedder(8),
+        cache_directory=None,
+        autotune=False,
+    )
+    engine.store.upsert_actions(["stale"], ["x"], [[1.0] * 8], [{"title": "x"}])
+
+    written = engine.index_action_batches(iter_action_batches(path, batch_size=4))
+    assert written == 25
+    hashes = engine.store.get_content_hashes()
+    assert "stale" not in hashes and len(hashes) == 25
+
+    # Unchanged re-run writes nothing
+    assert engine.index_action_batches(iter_action_batches(path, batch_size=4)) == 0
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import pytest
+
+from src.pdf_to_json import iter_page_texts, parse_action_pdf
+
+
+def _make_pdf(pages: list[str]) -> bytes:
+    """Build a minimal text PDF (one Helvetica text line per page)."""
+    objs: list[bytes] = []
+    n = len(pages)
+    page_ids = [4 + 2 * i for i in range(n)]
+    objs.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids).encode()
+    objs.append(b"<< /Type /Pages /Kids [" + kids + b"] /Count " + str(n).encode() + b" >>")
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(pages):
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objs.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+            b" /Resources << /Font << /F1 3 0 R >> >> /Contents "
+            + str(page_ids[i] + 1).encode()
+            + b" 0 R >>"
+        )
+        objs.append(
+            b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n"
+            + content
+            + b"\nendstream"
+        )
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objs, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+PAGES = [
+    "Action Build a landed cost model for all lanes. Owner: Finance Ops",
+    "Action Integrate supplier data through a secure API. Owner: Data Team",
+    "Action Launch monthly variance reviews with suppliers. Owner: Procurement",
+]
+
+
+def test_iter_page_texts_serial_and_pool_agree():
+    pdf = _make_pdf(PAGES)
+    serial = list(iter_page_texts(pdf, workers=1))
+    pooled = list(iter_page_texts(pdf, workers=2))
+    assert serial == pooled == PAGES
+
+
+def test_parse_action_pdf_heuristics_cached(monkeypatch, tmp_path):
+    from src import pdf_to_json
+
+    monkeypatch.setattr(pdf_to_json, "OPENAI_API_KEY", None)
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path))
+    pdf = _make_pdf(PAGES)
+    items = parse_action_pdf(pdf)
+    assert [i["id"] for i in items] == ["A1", "A2", "A3"]
+    assert items[0]["owner"] == "Finance Ops"
+
+    # Same bytes are served from the cache without touching the PDF
+    def _boom(*args, **kwargs):
+        raise AssertionError("PDF should not be re-extracted")
+
+    monkeypatch.setattr(pdf_to_json, "iter_page_texts", _boom)
+    assert parse_action_pdf(pdf) == items
+
+    assert pdf_to_json.invalidate_pdf_cache(pdf) == 1
+    with pytest.raises(AssertionError):
+        parse_action_pdf(pdf)
+
+
+def test_chunked_llm_extraction_merges_and_renumbers(monkeypatch):
+    from src import pdf_to_json
+
+    words = [f"w{i}" for i in range(3000)]
+    text = " ".join(words)
+    windows = pdf_to_json._split_windows(text, max_tokens=500, overlap_tokens=50)
+    assert len(windows) > 1
+    # Every word is covered and neighbouring windows overlap
+    assert set(" ".join(windows).split()) == set(words)
+    assert windows[0].split()[-1] in windows[1].split()
+
+    def fake_call(kind, window):
+        first = window.split()[0]
+        return [
+            {"id": "S1", "title": "Shared Goal!", "description": "short"},
+            {"id": "S2", "title": f"Goal {first}", "description": "d"},
+        ]
+
+    monkeypatch.setattr(pdf_to_json, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(pdf_to_json, "_call_openai_for_json", fake_call)
+    monkeypatch.setattr(pdf_to_json, "CHUNK_TOKENS", 500)
+    monkeypatch.setattr(pdf_to_json, "CHUNK_OVERLAP_TOKENS", 50)
+    items = pdf_to_json._extract_with_llm("strategic", text)
+    assert items is not None
+    assert [i["title"] for i in items][:2] == ["Shared Goal!", "Goal w0"]
+    assert sum(1 for i in items if i["title"] == "Shared Goal!") == 1
+    assert [i["id"] for i in items] == [f"S{n}" for n in range(1, len(items) + 1)]
+    assert len(items) == len(windows) + 1
+
+
+def test_streaming_heuristics_match_whole_text_split():
+    import random
+    import re
+
+    from src.pdf_to_json import _simple_heuristic_actions, _simple_heuristic_strategies
+
+    rng = random.Random(7)
+    vocab = ["strategy", "Strategy", "action", "ACTION", "kpis:", "owner:", "growth",
+             "margin", "supplier", "costs,", "reduce;", "Finance", "Ops.", "lanes!"]
+    pages = [" ".join(rng.choice(vocab) for _ in range(rng.randint(0, 60))) for _ in range(40)]
+    text = " ".join(p for p in pages if p)
+
+    # Section boundaries are identical to one re.split over the joined text
+    strategies = _simple_heuristic_strategies(iter(pages))
+    chunks = [c.strip() for c in re.split(r"(?i)\bstrategy\b", text)]
+    assert [s["description"] for s in strategies] == [c[:400].strip() for c in chunks if len(c) >= 25]
+    assert strategies == _simple_heuristic_strategies(text)
+
+    actions = _simple_heuristic_actions(iter(pages))
+    chunks = [c.strip() for c in re.split(r"(?i)\baction\b", text)]
+    assert [a["description"] for a in actions] == [c[:300].strip() for c in chunks if len(c) >= 25]
+
+
+def test_merge_keeps_distinct_entries_that_share_a_title():
+    from src.pdf_to_json import _merge_entries
+
+    batches = [
+        [
+            {"title": "Reduce costs", "description": "Freight pillar: renegotiate lanes"},
+            {"title": "Grow revenue", "description": "New markets in the north reg"},
+        ],
+        # Overlap repeats the entry cut at the window edge, now complete
+        [{"title": "Grow revenue", "description": "New markets in the north region"}],
+        [{"title": "Reduce costs", "description": "Energy pillar: cut plant usage"}],
+        [
+            {"title": "Hire", "description": "Data team"},
+            {"title": "Hire", "description": "Sales team"},
+        ],
+    ]
+    items = _merge_entries("strategic", batches)
+    assert [(i["title"], i["description"]) for i in items] == [
+        ("Reduce costs", "Freight pillar: renegotiate lanes"),
+        ("Grow revenue", "New markets in the north region"),
+        ("Reduce costs", "Energy pillar: cut plant usage"),
+        ("Hire", "Data team"),
+        ("Hire", "Sales team"),
+    ]
+    assert [i["id"] for i in items] == ["S1", "S2", "S3", "S4", "S5"]
+
+
+def test_pdf_cache_key_tracks_llm_and_chunk_settings(monkeypatch):
+    import src.pdf_to_json as pdf_to_json
+
+    pdf = b"%PDF-1.4 sample"
+    monkeypatch.delenv("PDF_EXTRACTION_MODE", raising=False)
+    monkeypatch.setattr(pdf_to_json, "OPENAI_API_KEY", None)
+    heuristic = pdf_to_json._pdf_cache_key(pdf, "action")
+
+    monkeypatch.setattr(pdf_to_json, "OPENAI_API_KEY", "test-key")
+    base = pdf_to_json._pdf_cache_key(pdf, "action")
+    assert base != heuristic
+    monkeypatch.setattr(pdf_to_json, "OPENAI_MODEL", "other-model")
+    by_model = pdf_to_json._pdf_cache_key(pdf, "action")
+    monkeypatch.setattr(pdf_to_json, "CHUNK_TOKENS", 500)
+    by_chunk = pdf_to_json._pdf_cache_key(pdf, "action")
+    monkeypatch.setattr(pdf_to_json, "CHUNK_OVERLAP_TOKENS", 50)
+    by_overlap = pdf_to_json._pdf_cache_key(pdf, "action")
+    assert len({base, by_model, by_chunk, by_overlap}) == 4
+    # Every variant stays under the per-PDF invalidation prefix
+    digest = pdf_to_json.hashlib.sha256(pdf).hexdigest() + ":"
+    assert all(k.startswith(digest) for k in (heuristic, base, by_overlap))
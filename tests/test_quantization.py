@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.embedding_cache import EmbeddingCache
+from src.quantization import QuantizedMatrix, quantize, recall_report
+from src.vector_store import InMemoryVectorStore
+
+
+def _vectors(n: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vecs = rng.normal(size=(n, dim)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("precision,tol", [("float16", 1e-3), ("int8", 2e-2)])
+def test_quantized_matrix_scores_close_to_float32(precision, tol):
+    vecs = _vectors(300)
+    queries = _vectors(5, seed=1)
+    matrix = QuantizedMatrix(precision)
+    matrix.chunk_rows = 64
+    matrix.append(vecs[:200])
+    matrix.append(vecs[200:])
+    matrix.assign(0, vecs[1])
+    vecs[0] = vecs[1]
+    assert np.abs(matrix.scores(queries) - queries @ vecs.T).max() < tol
+    assert matrix.nbytes < vecs.nbytes
+
+    matrix.take([2, 0])
+    assert np.allclose(matrix.to_float32(), vecs[[2, 0]], atol=tol)
+
+
+@pytest.mark.parametrize("precision", ["float32", "int8"])
+def test_quantized_matrix_streaming_appends_grow_in_place(precision):
+    vecs = _vectors(1000)
+    matrix = QuantizedMatrix(precision)
+    buffers = set()
+    for start in range(0, 1000, 10):
+        matrix.append(vecs[start : start + 10])
+        buffers.add(id(matrix._data))
+    assert len(matrix) == 1000
+    # Capacity doubles: a handful of reallocations, not one per append
+    assert len(buffers) <= 8
+    assert np.allclose(matrix.to_float32(), vecs, atol=2e-2)
+
+    matrix.take(range(0, 1000, 2))
+    matrix.append(vecs[:1])
+    assert len(matrix) == 501
+    assert np.allclose(matrix.to_float32()[-1], vecs[0], atol=2e-2)
+
+
+def test_int8_store_and_cache_round_trip(tmp_path):
+    vecs = _vectors(50)
+    ids = [f"A{i}" for i in range(50)]
+    store = InMemoryVectorStore(precision="int8")
+    store.upsert_actions(ids, ids, vecs, [{"title": i} for i in ids])
+    top = store.query_by_embeddings(vecs[:3], top_k=1)
+    assert [m[0]["id"] for m in top] == ids[:3]
+
+    cache = EmbeddingCache(tmp_path, precision="int8")
+    cache.put_many("m", ["a", "b"], vecs[:2])
+    got = np.asarray(cache.get_many("m", ["a", "b"]))
+    assert np.abs(got - vecs[:2]).max() < 1e-2
+    # Entries written at another precision are a miss, never a lossy hit
+    EmbeddingCache(tmp_path, precision="float16").put_many("m", ["c"], vecs[2:3])
+    assert cache.get_many("m", ["c"]) == [None]
+
+
+def test_recall_report():
+    report = recall_report(_vectors(500), _vectors(20, seed=2), top_k=5)
+    fp16 = report["precisions"]["float16"]
+    int8 = report["precisions"]["int8"]
+    assert fp16["recall_at_k"] >= 0.95 and fp16["compression"] == 2.0
+    assert int8["recall_at_k"] >= 0.8 and int8["compression"] > 3.5
+    assert int8["max_abs_drift"] < 0.05
+    assert quantize(np.zeros((1, 4)), "int8")[1].tolist() == [0.0]
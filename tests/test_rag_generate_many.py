@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.models import StrategicObjective
+from src.rag_engine import RAGEngine
+
+pytest.importorskip("openai")
+
+
+class _StubState:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+
+def _make_handler(state: _StubState):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):  # keep test output quiet
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][-1]["content"]
+            title = re.search(r"Strategic Objective:\n\n(.*)\n", prompt).group(1)
+            with state.lock:
+                state.calls += 1
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            time.sleep(0.1)
+            with state.lock:
+                state.in_flight -= 1
+            if title == "Broken":
+                content = "not json at all"
+            else:
+                content = json.dumps(
+                    {
+                        "explanation": f"stub for {title}",
+                        "suggested_actions": ["a", "b", "c"],
+                        "kpis": ["k1", "k2"],
+                        "timeline_and_ownership": {"owner": "o"},
+                        "risks": ["r"],
+                    }
+                )
+            payload = json.dumps(
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+@pytest.fixture
+def stub_server():
+    state = _StubState()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1", state
+    finally:
+        server.shutdown()
+
+
+def test_generate_many_concurrent_ordered_with_fallback(
+    stub_server, monkeypatch, tmp_path
+):
+    base_url, state = stub_server
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    rag = RAGEngine(
+        model="stub-model",
+        base_url=base_url,
+        max_concurrency=3,
+        cache_directory=str(tmp_path),
+    )
+
+    titles = ["S0", "S1", "Broken", "S3", "S4", "S5", "S6"]
+    requests = [
+        {
+            "strategy": StrategicObjective(id=t, title=t, description="d"),
+            "current_score": 0.4,
+            "retrieved_actions": [{"title": "x", "similarity": 0.4}],
+        }
+        for t in titles
+    ]
+    out = asyncio.run(rag.generate_many(requests))
+
+    assert state.calls == len(titles)
+    assert 1 < state.max_in_flight <= 3
+    for t, res in zip(titles, out):
+        if t == "Broken":
+            # Rule-based fallback for the failed item only
+            assert res == rag._fallback_rule_based(**requests[2])
+        else:
+            assert res["explanation"] == f"stub for {t}"
+
+    # Unchanged prompts are answered from the response cache; only the
+    # item that fell back is retried
+    again = asyncio.run(rag.generate_many(requests))
+    assert again == out
+    assert state.calls == len(titles) + 1
+    assert rag.generate(**requests[0]) == out[0]
+    assert state.calls == len(titles) + 1
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.similarity_matrix import compute_sparse_similarity
+
+
+def test_sparse_similarity_matches_dense_and_derives_metrics():
+    rng = np.random.default_rng(1)
+    s_embs = rng.normal(size=(7, 6)).astype(np.float32)
+    a_embs = rng.normal(size=(23, 6)).astype(np.float32)
+    s_ids = [f"S{i}" for i in range(7)]
+    a_ids = [f"A{i}" for i in range(23)]
+
+    # Small blocks force several row/column blocks
+    m = compute_sparse_similarity(s_embs, a_embs, s_ids, a_ids, floor=0.2, block_size=4)
+
+    s_n = s_embs / np.linalg.norm(s_embs, axis=1, keepdims=True)
+    a_n = a_embs / np.linalg.norm(a_embs, axis=1, keepdims=True)
+    dense = s_n @ a_n.T
+    kept = dense >= 0.2
+    assert m.nnz == int(kept.sum())
+    assert m.shape == (7, 23)
+
+    ptr = m.indptr()
+    for i in range(7):
+        cols = m.cols[ptr[i] : ptr[i + 1]]
+        assert cols.tolist() == np.nonzero(kept[i])[0].tolist()
+        np.testing.assert_allclose(m.values[ptr[i] : ptr[i + 1]], dense[i, cols], atol=1e-6)
+
+    best_action = np.where(kept, dense, 0.0).max(axis=0)
+    assert m.orphan_actions(0.5) == [a for a, b in zip(a_ids, best_action) if b < 0.5]
+    assert m.strategy_breadth(0.5) == {
+        sid: int((dense[i] >= 0.5).sum()) for i, sid in enumerate(s_ids)
+    }
+    top = m.top_k(2)
+    assert top[0][0][0] == a_ids[int(np.argmax(np.where(kept[0], dense[0], -1)))]
+    assert m.to_dict()["indptr"][-1] == m.nnz
+
+
+def test_matrix_mode_handles_empty_strategies_and_actions():
+    from src.alignment import AlignmentEngine
+    from src.synthetic import HashEmbedder, synthetic_actions, synthetic_strategies
+
+    def engine():
+        return AlignmentEngine(
+            model_name="m",
+            cache_directory=None,
+            vector_backend="memory",
+            embedder=HashEmbedder(),
+            autotune=False,
+        )
+
+    strategies, actions = synthetic_strategies(3), synthetic_actions(5)
+    no_strategies = engine().align([], actions, mode="matrix")
+    assert no_strategies["strategy_results"] == []
+    assert no_strategies["similarity_matrix"]["shape"] == [0, 5]
+
+    no_actions = engine().align(strategies, [], mode="matrix")
+    assert no_actions["similarity_matrix"]["shape"] == [3, 0]
+    assert all(r["top_matches"] == [] for r in no_actions["strategy_results"])
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.vector_store import InMemoryVectorStore
+
+
+def test_in_memory_store_exact_top_k():
+    rng = np.random.default_rng(0)
+    embs = rng.normal(size=(50, 8)).astype(np.float32)
+    ids = [f"A{i}" for i in range(50)]
+    store = InMemoryVectorStore()
+    store.upsert_actions(
+        ids=ids,
+        documents=[f"doc {i}" for i in ids],
+        embeddings=embs,
+        metadatas=[{"title": i, "owner": None} for i in ids],
+    )
+
+    queries = rng.normal(size=(3, 8)).astype(np.float32)
+    results = store.query_by_embeddings(queries, top_k=5)
+    assert len(results) == 3
+
+    normed = embs / np.linalg.norm(embs, axis=1, keepdims=True)
+    for q, matches in zip(queries, results):
+        sims = normed @ (q / np.linalg.norm(q))
+        expected = [ids[i] for i in np.argsort(-sims)[:5]]
+        assert [m["id"] for m in matches] == expected
+        assert set(matches[0]) == {"id", "similarity", "metadata", "document"}
+        assert matches[0]["metadata"]["owner"] == ""
+
+    # Update in place and delete
+    store.upsert_actions(["A0"], ["changed"], [queries[0]], [{"title": "A0"}])
+    assert store.query_by_embedding(queries[0], top_k=1)[0]["id"] == "A0"
+    store.delete_actions(["A0", "missing"])
+    assert len(store) == 49
+    assert "A0" not in store.get_content_hashes()
+
+
+def test_in_memory_upsert_repeated_new_id_is_last_write_wins():
+    embs = np.eye(3, dtype=np.float32)
+    store = InMemoryVectorStore(precision="int8")
+    store.upsert_actions(
+        ["A", "B", "A"],
+        ["first", "b", "last"],
+        embs,
+        [{"content_hash": "h1"}, {"content_hash": "hb"}, {"content_hash": "h2"}],
+    )
+    assert len(store) == 2
+    assert store.get_content_hashes() == {"A": "h2", "B": "hb"}
+    top = store.query_by_embedding(embs[2], top_k=1)[0]
+    assert (top["id"], top["document"]) == ("A", "last")
+    assert store.query_by_embedding(embs[1], top_k=1)[0]["id"] == "B"
+
+
+def test_action_table_upsert_matches_list_path():
+    from datetime import date
+
+    from src.action_table import ActionTable
+    from src.models import ActionTask
+
+    actions = [
+        ActionTask(
+            id=f"A{i}",
+            title=f"Task {i}",
+            description="d",
+            owner="Ops",
+            start_date=date(2026, 1, 1) if i == 0 else None,
+        )
+        for i in range(4)
+    ]
+    table = ActionTable.from_actions(actions)
+    table.embeddings = np.eye(4, dtype=np.float32)
+    table.content_hashes = [f"h{i}" for i in range(4)]
+
+    by_table = InMemoryVectorStore()
+    by_table.upsert_table(table)
+    by_list = InMemoryVectorStore()
+    by_list.upsert_actions(table.ids, table.documents, table.embeddings, table.metadatas())
+
+    q = np.array([0.1, 0.9, 0.2, 0.0], dtype=np.float32)
+    assert by_table.query_by_embedding(q, 4) == by_list.query_by_embedding(q, 4)
+    assert by_table.get_content_hashes() == {f"A{i}": f"h{i}" for i in range(4)}
+
+    sub = table.take([2, 0])
+    assert sub.ids == ["A2", "A0"]
+    assert sub.metadata(1)["start_date"] == "2026-01-01"
+    assert sub.embeddings.shape == (2, 4)
+
+
+def test_chroma_multi_query_matches_memory_per_strategy(tmp_path):
+    from src.vector_store import ActionVectorStore
+
+    rng = np.random.default_rng(3)
+    embs = rng.normal(size=(60, 16)).astype(np.float32)
+    ids = [f"A{i}" for i in range(60)]
+    docs = [f"doc {i}" for i in ids]
+    metas = [{"title": i} for i in ids]
+    memory = InMemoryVectorStore()
+    chroma = ActionVectorStore(persist_directory=str(tmp_path / "chroma"))
+    for store in (memory, chroma):
+        store.upsert_actions(ids, docs, embs, metas)
+
+    # Queries near distinct actions, so each strategy has a different answer
+    queries = embs[[5, 41, 17, 5]] + rng.normal(scale=0.05, size=(4, 16))
+    for top_k in (1, 3, 7):
+        expected = memory.query_by_embeddings(queries, top_k=top_k)
+        got = chroma.query_by_embeddings(queries, top_k=top_k)
+        assert len(got) == 4
+        for exp, res in zip(expected, got):
+            assert [m["id"] for m in res] == [m["id"] for m in exp]
+            assert [m["document"] for m in res] == [m["document"] for m in exp]
+            np.testing.assert_allclose(
+                [m["similarity"] for m in res],
+                [m["similarity"] for m in exp],
+                atol=1e-4,
+            )
+        assert [r[0]["id"] for r in got] == ["A5", "A41", "A17", "A5"]